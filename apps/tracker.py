@@ -11,7 +11,7 @@ PEERS = {}
 # ----------------------------------------------------------
 # 1. /submit-info → Peer registration
 # ----------------------------------------------------------
-@app.route('/submit-info', methods=['POST'])
+@app.route('/submit-info', methods=['POST'], public=True)
 def submit_info(headers, body):
     """
     body: {"ip": "...", "port": 8001}
@@ -31,7 +31,7 @@ def submit_info(headers, body):
 # ----------------------------------------------------------
 # 2. /get-list → Peer discovery
 # ----------------------------------------------------------
-@app.route('/get-list', methods=['GET'])
+@app.route('/get-list', methods=['GET'], public=True)
 def get_list(headers, body):
     lst = list(PEERS.values())
     return json.dumps({"status": "ok", "peers": lst}), "application/json"
@@ -40,7 +40,7 @@ def get_list(headers, body):
 # ----------------------------------------------------------
 # 3. /connect-peer → Setup direct P2P connections
 # ----------------------------------------------------------
-@app.route('/connect-peer', methods=['POST'])
+@app.route('/connect-peer', methods=['POST'], public=True)
 def connect_peer(headers, body):
     """
     body: {"from": {"ip":..., "port":...}, "to": {"ip":..., "port":...}}
@@ -53,7 +53,7 @@ def connect_peer(headers, body):
 # ----------------------------------------------------------
 # 4. /broadcast-peer
 # ----------------------------------------------------------
-@app.route('/broadcast-peer', methods=['POST'])
+@app.route('/broadcast-peer', methods=['POST'], public=True)
 def broadcast_peer(headers, body):
     data = json.loads(body)
     print("[Tracker] Broadcast request:", data)
@@ -63,7 +63,7 @@ def broadcast_peer(headers, body):
 # ----------------------------------------------------------
 # 5. /send-peer → Optional direct messaging request
 # ----------------------------------------------------------
-@app.route('/send-peer', methods=['POST'])
+@app.route('/send-peer', methods=['POST'], public=True)
 def send_peer(headers, body):
     data = json.loads(body)
     print("[Tracker] Peer-to-peer send:", data)
@@ -0,0 +1,132 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+bench_request_parse
+~~~~~~~~~~~~~~~~~
+
+Microbenchmark of :meth:`Request.prepare <daemon.request.Request.prepare>`
+against the previous ``str`` based parser, which decoded the whole message,
+split it three times (request line, headers, body) and re-encoded the body
+to compute its length.
+
+Usage::
+  $ python benchmarks/bench_request_parse.py --number 20000 --body-size 65536
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from daemon.dictionary import CaseInsensitiveDict
+from daemon.request import Request
+
+
+def build_request(body_size):
+    body = b'{"ip": "192.168.56.103", "port": 8001, "name": "' + b"x" * body_size + b'"}'
+    return (
+        b"POST /submit-info HTTP/1.1\r\n"
+        b"Host: 192.168.56.103:7000\r\n"
+        b"User-Agent: Mozilla/5.0 (X11; Linux x86_64) WeApRousBench/1.0\r\n"
+        b"Accept: application/json, text/plain, */*\r\n"
+        b"Accept-Language: en-US,en;q=0.9,vi;q=0.8\r\n"
+        b"Accept-Encoding: gzip, deflate\r\n"
+        b"Content-Type: application/json\r\n"
+        b"Cookie: sessionid=0f6c2d1e-8c1b-4a39-9a53-bb2d4d7d9a10; theme=dark; auth=true\r\n"
+        b"Connection: keep-alive\r\n"
+        b"Content-Length: " + str(len(body)).encode() + b"\r\n"
+        b"\r\n" + body
+    )
+
+
+class LegacyRequest(Request):
+    """:class:`Request <Request>` with the parser used before the single-pass
+    bytes parser."""
+
+    def extract_request_line(self, request):
+        try:
+            lines = request.splitlines()
+            first_line = lines[0]
+            method, path, version = first_line.split()
+
+            if path == "/":
+                path = "/index.html"
+        except Exception:
+            return None, None, None
+
+        return method, path, version
+
+    def prepare_headers(self, request):
+        lines = request.split("\r\n")
+        headers = {}
+        for line in lines[1:]:
+            if ": " in line:
+                key, val = line.split(": ", 1)
+                headers[key.lower()] = val
+        return CaseInsensitiveDict(headers)
+
+    def prepare(self, request, routes=None):
+        self.method, self.path, self.version = self.extract_request_line(request)
+        print(f"[Request] {self.method} path {self.path} version {self.version}")
+
+        if routes:
+            self.routes = routes
+            self.hook = routes.get((self.method, self.path))
+
+        self.headers = self.prepare_headers(request)
+
+        body_pattern = "\r\n\r\n"
+        body = request.split(body_pattern, 1)[1] if body_pattern in request else ""
+        self.prepare_body(body)
+
+        cookies = self.headers.get("cookie", "")
+        if cookies:
+            self.cookies = self.prepare_cookies(cookies)
+        else:
+            self.cookies = CaseInsensitiveDict()
+
+        return self
+
+
+def legacy_prepare(raw):
+    return LegacyRequest().prepare(raw.decode())
+
+
+def current_prepare(raw):
+    return Request().prepare(raw)
+
+
+def bench(func, raw, number):
+    sink = io.StringIO()
+    with contextlib.redirect_stdout(sink):
+        return min(timeit.repeat(lambda: func(raw), number=number, repeat=5))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog='bench_request_parse')
+    parser.add_argument('--number', type=int, default=20000)
+    parser.add_argument('--body-size', type=int, default=512)
+    args = parser.parse_args()
+
+    raw = build_request(args.body_size)
+    legacy = bench(legacy_prepare, raw, args.number)
+    current = bench(current_prepare, raw, args.number)
+
+    print("request size: {} bytes, {} iterations".format(len(raw), args.number))
+    print("legacy  str parser : {:8.2f} us/request".format(legacy / args.number * 1e6))
+    print("current bytes parser: {:8.2f} us/request".format(current / args.number * 1e6))
+    print("speedup            : {:8.2f}x".format(legacy / current))
@@ -0,0 +1,175 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.asyncbackend
+~~~~~~~~~~~~~~~~~
+
+This module provides the event-loop engine of the backend daemon. Instead of
+one thread per connection it multiplexes every client socket on a single
+``asyncio`` loop (epoll/kqueue through ``selectors``), so idle peers only cost
+a few kilobytes of memory each.
+
+The request processing itself is shared with the threaded engine through
+:meth:`HttpAdapter.handle_request_async <HttpAdapter.handle_request_async>`,
+which awaits ``async def`` route handlers on this loop.
+
+Usage Example:
+--------------
+>>> create_backend("127.0.0.1", 9000, routes={}, engine="async")
+
+"""
+
+import asyncio
+
+from .httpadapter import HttpAdapter
+from .httpreader import (HttpError, HEADER_END, CONTINUE, MAX_HEADER_SIZE,
+                         body_length, expects_continue)
+from .response import Response
+
+#: Listen backlog of the event-loop server.
+BACKLOG = 1024
+
+
+async def read_request(reader, writer, max_body_size, max_header_size=MAX_HEADER_SIZE):
+    """
+    Read one full HTTP request (header block and body) from the stream.
+
+    The ``limit`` of the stream reader stops a runaway header block early;
+    the header block, terminator included, is then held to
+    ``max_header_size`` exactly as :class:`RequestReader` does.
+
+    :param reader (asyncio.StreamReader): The client read stream.
+    :param writer (asyncio.StreamWriter): The client write stream.
+    :param max_body_size (int): Largest accepted body.
+    :param max_header_size (int): Largest accepted header block.
+    :raise HttpError: the request is malformed or exceeds a size limit.
+    :rtype bytes: The raw request, or None if the client closed the connection.
+    """
+    try:
+        header = await reader.readuntil(HEADER_END)
+    except asyncio.IncompleteReadError:
+        return None
+    except asyncio.LimitOverrunError:
+        raise HttpError(431, "Request Header Fields Too Large")
+    if len(header) > max_header_size:
+        raise HttpError(431, "Request Header Fields Too Large")
+
+    length = body_length(header, max_body_size)
+    if not length:
+        return header
+
+    if expects_continue(header):
+        writer.write(CONTINUE)
+
+    try:
+        body = await reader.readexactly(length)
+    except asyncio.IncompleteReadError:
+        return None
+    return header + body
+
+
+async def handle_client(ip, port, reader, writer, routes, max_header_size=MAX_HEADER_SIZE):
+    """
+    Serve one client connection on the event loop, including any further
+    requests sent on it while it is kept alive.
+
+    :param ip (str): IP address of the server.
+    :param port (int): Port number the server is listening on.
+    :param reader (asyncio.StreamReader): The client read stream.
+    :param writer (asyncio.StreamWriter): The client write stream.
+    :param routes (dict): Dictionary of route handlers.
+    :param max_header_size (int): Largest accepted request header block.
+    """
+    addr = writer.get_extra_info("peername")
+    print("[AsyncBackend] Client connected from {}".format(addr))
+
+    daemon = HttpAdapter(ip, port, None, addr, routes, max_header_size=max_header_size)
+    try:
+        while True:
+            try:
+                msg = await asyncio.wait_for(
+                    read_request(reader, writer, daemon.max_body_size, daemon.max_header_size),
+                    daemon.keepalive_timeout)
+            except asyncio.TimeoutError:
+                break
+            except HttpError as e:
+                print("[AsyncBackend] Rejecting request from {}: {}".format(addr, e))
+                writer.write(Response().build_error(e.status_code, e.reason))
+                await writer.drain()
+                break
+            if not msg:
+                break
+
+            response = await daemon.handle_request_async(msg, routes)
+            writer.write(response)
+            if daemon.response.stream is not None:
+                await daemon.response.stream.send_async(writer)
+            await writer.drain()
+
+            if not daemon.response.keep_alive:
+                break
+    except ConnectionError as e:
+        print("[AsyncBackend] Connection error from {}: {}".format(addr, e))
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def serve(ip, port, routes, server=None, max_header_size=MAX_HEADER_SIZE):
+    """
+    Start the event-loop server and serve until cancelled.
+
+    :param ip (str): IP address to bind the server.
+    :param port (int): Port number to listen on.
+    :param routes (dict): Dictionary of route handlers.
+    :param server (socket.socket, optional): An already listening socket.
+    :param max_header_size (int): Largest accepted request header block, the
+                                  same limit the threaded engine applies.
+    """
+    async def on_connect(reader, writer):
+        await handle_client(ip, port, reader, writer, routes, max_header_size)
+
+    # The reader limit bounds the bytes searched before the header terminator
+    limit = max_header_size
+    if server is not None:
+        aserver = await asyncio.start_server(on_connect, sock=server, limit=limit)
+    else:
+        aserver = await asyncio.start_server(on_connect, ip, port, backlog=BACKLOG,
+                                             limit=limit)
+    print("[AsyncBackend] Listening on port {}".format(port))
+    if routes:
+        print("[AsyncBackend] route settings {}".format(routes))
+
+    async with aserver:
+        await aserver.serve_forever()
+
+
+def run_async_backend(ip, port, routes, server=None, max_header_size=MAX_HEADER_SIZE):
+    """
+    Run the event-loop backend in the calling thread.
+
+    :param ip (str): IP address to bind the server.
+    :param port (int): Port number to listen on.
+    :param routes (dict): Dictionary of route handlers.
+    :param server (socket.socket, optional): An already listening socket.
+    :param max_header_size (int): Largest accepted request header block.
+    """
+    try:
+        asyncio.run(serve(ip, port, routes, server, max_header_size))
+    except OSError as e:
+        print("Socket error: {}".format(e))
+    except KeyboardInterrupt:
+        pass
@@ -26,17 +26,29 @@ Requirements:
 - response: response utilities.
 - httpadapter: the class for handling HTTP requests.
 - CaseInsensitiveDict: provides dictionary for managing headers or routes.
+- workerpool: bounded pool of reusable worker threads.
+- asyncbackend: the non-blocking event-loop engine.
+- prefork: supervisor running several worker processes on one port.
 
 
 Notes:
 ------
-- The server create daemon threads for client handling.
+- The server create daemon threads for client handling. When ``max_workers`` is
+  given, a fixed :class:`WorkerPool <WorkerPool>` is used instead and the server
+  answers ``503 Service Unavailable`` once the pending queue is full.
+- ``engine="async"`` selects the event-loop engine of :mod:`daemon.asyncbackend`,
+  which serves every connection from one thread without blocking sockets.
+- ``workers=N`` forks N backend processes sharing the listening port (see
+  :mod:`daemon.prefork`), each running the selected engine.
 - The current implementation error handling is minimal, socket errors are printed to the console.
 - The actual request processing is delegated to the HttpAdapter class.
 
 Usage Example:
 --------------
 >>> create_backend("127.0.0.1", 9000, routes={})
+>>> create_backend("127.0.0.1", 9000, routes={}, max_workers=32, queue_size=128)
+>>> create_backend("127.0.0.1", 9000, routes={}, engine="async")
+>>> create_backend("0.0.0.0", 9000, routes={}, workers=4)
 
 """
 
@@ -47,8 +59,16 @@ import argparse
 from .response import *
 from .httpadapter import HttpAdapter
 from .dictionary import CaseInsensitiveDict
+from .workerpool import WorkerPool
+from .asyncbackend import run_async_backend
+from .prefork import run_prefork
+from .middleware import compile_routes
+from .httpreader import MAX_HEADER_SIZE
 
-def handle_client(ip, port, conn, addr, routes):
+#: Server engines accepted by :func:`create_backend`.
+ENGINES = ("thread", "async")
+
+def handle_client(ip, port, conn, addr, routes, max_header_size=MAX_HEADER_SIZE):
     """
     Initializes an HttpAdapter instance and delegates the client handling logic to it.
 
@@ -57,40 +77,81 @@ def handle_client(ip, port, conn, addr, routes):
     :param conn (socket.socket): Client connection socket.
     :param addr (tuple): client address (IP, port).
     :param routes (dict): Dictionary of route handlers.
+    :param max_header_size (int): Largest accepted request header block.
     """
-    daemon = HttpAdapter(ip, port, conn, addr, routes)
+    daemon = HttpAdapter(ip, port, conn, addr, routes, max_header_size=max_header_size)
 
     # Handle client
     daemon.handle_client(conn, addr, routes)
 
-def run_backend(ip, port, routes):
+def reject_client(conn, addr):
+    """
+    Sheds an accepted connection when every worker is busy and the queue is full.
+
+    :param conn (socket.socket): Client connection socket.
+    :param addr (tuple): client address (IP, port).
+    """
+    print("[Backend] Worker pool saturated, rejecting {}".format(addr))
+    try:
+        conn.sendall(Response().build_unavailable())
+    except socket.error:
+        pass
+    finally:
+        conn.close()
+
+def run_backend(ip, port, routes, max_workers=None, queue_size=None, server=None,
+                max_header_size=MAX_HEADER_SIZE):
     """
     Starts the backend server, binds to the specified IP and port, and listens for incoming
     connections. Each connection is handled in a separate thread. The backend accepts incoming
-    connections and spawns a thread for each client.
+    connections and spawns a thread for each client, or hands them to a bounded worker
+    pool when ``max_workers`` is set.
 
 
     :param ip (str): IP address to bind the server.
     :param port (int): Port number to listen on.
     :param routes (dict): Dictionary of route handlers.
+    :param max_workers (int, optional): Size of the worker pool. Defaults to one
+            thread per connection.
+    :param queue_size (int, optional): Bound of the accepted connections waiting
+            for a worker.
+    :param server (socket.socket, optional): An already listening socket, as
+            handed to pre-forked workers. Defaults to binding a new one.
+    :param max_header_size (int, optional): Largest accepted request header block.
     """
-    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    prebound = server is not None
+    if not prebound:
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+
+    pool = None
+    if max_workers:
+        pool = WorkerPool(max_workers, queue_size, name="backend")
+        pool.start()
 
     try:
-        server.bind((ip, port))
-        server.listen(50)
+        if not prebound:
+            server.bind((ip, port))
+            server.listen(50)
         print("[Backend] Listening on port {}".format(port))
-        if routes != {}:
+        if routes:
             print("[Backend] route settings {}".format(routes))
+        if pool:
+            print("[Backend] worker pool {} threads, queue {}".format(
+                pool.max_workers, pool.queue_size))
 
         while True:
             conn, addr = server.accept()
 
             print("[Backend] Client connected from {}".format(addr))
+
+            if pool:
+                if not pool.submit(handle_client, ip, port, conn, addr, routes, max_header_size):
+                    reject_client(conn, addr)
+                continue
             
             client_thread = threading.Thread(
                 target=handle_client,
-                args=(ip, port, conn, addr, routes)
+                args=(ip, port, conn, addr, routes, max_header_size)
             )
             client_thread.daemon = True
             client_thread.start()
@@ -98,13 +159,62 @@ def run_backend(ip, port, routes):
     except socket.error as e:
       print("Socket error: {}".format(e))
 
-def create_backend(ip, port, routes={}):
+def serve_backend(ip, port, routes, max_workers=None, queue_size=None, engine="thread", server=None,
+                  max_header_size=MAX_HEADER_SIZE):
+    """
+    Run the selected backend engine in the current process.
+
+    :param server (socket.socket, optional): An already listening socket.
+    :rtype: None. See :func:`create_backend` for the other parameters.
+    """
+    if Response.static_index is not None:
+        Response.static_index.start_watcher()
+
+    if engine == "async":
+        run_async_backend(ip, port, routes, server, max_header_size)
+    else:
+        run_backend(ip, port, routes, max_workers, queue_size, server, max_header_size)
+
+def create_backend(ip, port, routes={}, max_workers=None, queue_size=None, engine="thread",
+                   workers=1, reuse_port=False, max_header_size=MAX_HEADER_SIZE):
     """
     Entry point for creating and running the backend server.
 
     :param ip (str): IP address to bind the server.
     :param port (int): Port number to listen on.
-    :param routes (dict, optional): Dictionary of route handlers. Defaults to empty dict.
+    :param routes (dict, optional): Dictionary of route handlers, or a compiled
+            :class:`Router <Router>` from
+            :func:`compile_routes <daemon.middleware.compile_routes>`. Defaults to empty dict.
+    :param max_workers (int, optional): Size of the worker pool. Defaults to one
+            thread per connection.
+    :param queue_size (int, optional): Bound of the accepted connections waiting
+            for a worker.
+    :param engine (str, optional): ``"thread"`` for blocking sockets served by
+            threads, ``"async"`` for the event-loop engine. Defaults to ``"thread"``.
+    :param workers (int, optional): Number of forked backend processes sharing
+            the port. Defaults to 1 (no fork).
+    :param reuse_port (bool, optional): With ``workers > 1``, let every process
+            bind its own ``SO_REUSEPORT`` socket instead of inheriting one.
+    :param max_header_size (int, optional): Largest accepted request header
+            block, enforced the same way by both engines.
     """
 
-    run_backend(ip, port, routes)
\ No newline at end of file
+    if engine not in ENGINES:
+        raise ValueError("Unknown backend engine '{}', expected one of {}".format(engine, ENGINES))
+
+    # Compile the routing table and middleware chains once, before any worker starts
+    routes = compile_routes(routes)
+
+    # Index the static files once; forked workers inherit the index
+    if Response.static_index is not None:
+        count = Response.static_index.scan()
+        print("[Backend] indexed {} static files".format(count))
+
+    if workers and workers > 1:
+        def serve(server):
+            serve_backend(ip, port, routes, max_workers, queue_size, engine, server,
+                          max_header_size)
+        run_prefork(ip, port, workers, serve, reuse_port, name="Backend")
+    else:
+        serve_backend(ip, port, routes, max_workers, queue_size, engine,
+                      max_header_size=max_header_size)
\ No newline at end of file
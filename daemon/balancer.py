@@ -0,0 +1,413 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.balancer
+~~~~~~~~~~~~~~~~~
+
+This module provides the load balancing state of the proxy.
+
+Each virtual host of ``config/proxy.conf`` gets an :class:`UpstreamGroup`
+holding its ``proxy_pass`` servers as :class:`Upstream` objects. The group
+counts the requests in flight on each upstream; a request is counted from the
+moment an upstream is chosen for it until its response has been relayed, so
+``least_conn`` sees the load the proxy is actually putting on each backend.
+The weighted round-robin rotation is also kept per group, under the group
+lock, so virtual hosts do not advance each other's rotation.
+
+The hash policies send every request with the same key (client address,
+session cookie, ...) to the same upstream. ``hash $key consistent`` places
+the upstreams on a ketama ring of virtual nodes, so adding or removing one
+upstream only moves the keys of the arc it gains or loses, about ``1/n`` of
+the clients, instead of reshuffling nearly all of them.
+
+An upstream that fails ``max_fails`` requests in a row is ejected: no
+policy chooses it until its ejection time has passed. It is then half-open
+and receives a single trial request; success restores it, failure ejects it
+again for twice as long. The active probes of :mod:`daemon.health` report
+to the same state, so a probe that succeeds restores an upstream early.
+When every upstream of a group is ejected, all of them are tried anyway.
+
+The counters live in the proxy process: with ``--workers``, each pre-forked
+worker balances its own share of the traffic.
+
+Usage Example:
+--------------
+>>> group = BALANCER.group("app2.local", ["127.0.0.1:9002", "127.0.0.1:9003"])
+>>> upstream = group.smooth_round_robin()
+>>> try:
+...     forward_request(upstream.host, upstream.port, head, body, conn)
+... finally:
+...     group.release(upstream)
+"""
+
+import bisect
+import hashlib
+import threading
+import time
+import zlib
+
+#: Consecutive failed requests that eject an upstream.
+MAX_FAILS = 3
+
+#: Seconds of the first ejection of an upstream.
+FAIL_TIMEOUT = 5.0
+
+#: Longest ejection; the ejection time doubles up to this after each
+#: failed trial request.
+MAX_FAIL_TIMEOUT = 120.0
+
+#: Points of an upstream of weight 1 on the consistent hash ring. Each MD5
+#: digest gives four points, as in ketama.
+RING_POINTS = 160
+
+
+def ring_hash(key):
+    """Return the position of ``key`` on the consistent hash ring."""
+    return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:4], "little")
+
+
+def parse_server(entry):
+    """
+    Parse a ``proxy_pass`` server of the routing table.
+
+    :param entry (str): ``host:port``, optionally followed by ``weight=N``.
+    :raise ValueError: the port or the weight is not a positive integer.
+    :rtype tuple: ``(host, port, weight)``.
+    """
+    address, *options = entry.split()
+    host, _, port = address.rpartition(":")
+    weight = 1
+    for option in options:
+        name, _, value = option.partition("=")
+        if name == "weight":
+            if not value.isdigit() or int(value) < 1:
+                raise ValueError("Invalid weight '{}' in '{}'; expected a positive "
+                                 "integer".format(value, entry))
+            weight = int(value)
+    return host, int(port), weight
+
+
+class Upstream:
+    """One backend server of an :class:`UpstreamGroup`.
+
+    Attributes:
+        host (str): Backend host.
+        port (int): Backend port.
+        weight (int): Relative capacity of the backend.
+        index (int): Position of the server in its group.
+        in_flight (int): Requests currently relayed to the backend.
+        requests (int): Requests sent to the backend so far.
+        current_weight (int): Smooth weighted round-robin credit.
+        failures (int): Consecutive failed requests.
+        ejections (int): Consecutive ejections, the backoff exponent.
+        down_until (float): Monotonic time the ejection ends, 0 when up.
+        trial (bool): A half-open trial request is in flight.
+        probe_failed (bool): The current ejection was caused by a failed
+                             active health probe.
+    """
+
+    __slots__ = ("host", "port", "weight", "index", "in_flight", "requests", "current_weight",
+                 "failures", "ejections", "down_until", "trial", "probe_failed")
+
+    def __init__(self, host, port, weight=1, index=0):
+        self.host = host
+        self.port = port
+        self.weight = weight
+        self.index = index
+        self.in_flight = 0
+        self.requests = 0
+        self.current_weight = 0
+        self.failures = 0
+        self.ejections = 0
+        self.down_until = 0
+        self.trial = False
+        self.probe_failed = False
+
+    @property
+    def address(self):
+        return "{}:{}".format(self.host, self.port)
+
+    def available(self, now):
+        """Return True when the upstream may be chosen at monotonic time ``now``."""
+        if not self.down_until:
+            return True
+        # Half-open: one trial request once the ejection time has passed
+        return now >= self.down_until and not self.trial
+
+    def __repr__(self):
+        return "<Upstream {} weight={} in_flight={}>".format(self.address, self.weight, self.in_flight)
+
+
+class UpstreamGroup:
+    """The backend servers of one virtual host and their in-flight counters.
+
+    Every selection and release happens under the group lock, so two
+    concurrent requests never both see the same upstream as the least
+    loaded one. Selections skip ejected upstreams.
+
+    Attributes:
+        upstreams (list): The :class:`Upstream` servers, in configuration order.
+        max_fails (int): Consecutive failed requests that eject an upstream.
+        fail_timeout (float): Seconds of the first ejection.
+        max_fail_timeout (float): Longest ejection.
+    """
+
+    def __init__(self, servers, max_fails=MAX_FAILS, fail_timeout=FAIL_TIMEOUT,
+                 max_fail_timeout=MAX_FAIL_TIMEOUT):
+        """
+        Initialize a new UpstreamGroup instance.
+
+        :param servers (list): ``proxy_pass`` entries, see :func:`parse_server`.
+        :param max_fails (int): Consecutive failed requests that eject an upstream.
+        :param fail_timeout (float): Seconds of the first ejection.
+        :param max_fail_timeout (float): Longest ejection.
+        """
+        self.upstreams = [Upstream(*parse_server(entry), index=i)
+                          for i, entry in enumerate(servers)]
+        self.max_fails = max_fails
+        self.fail_timeout = fail_timeout
+        self.max_fail_timeout = max_fail_timeout
+        self._lock = threading.Lock()
+        self._ring = None
+        self._ring_points = None
+
+    def _start(self, upstream):
+        if upstream.down_until:
+            upstream.trial = True
+        upstream.in_flight += 1
+        upstream.requests += 1
+        return upstream
+
+    def _candidates(self):
+        now = time.monotonic()
+        available = [u for u in self.upstreams if u.available(now)]
+        return available or self.upstreams
+
+    def _from(self, index):
+        """Return the first available upstream from ``index`` on, in configuration order."""
+        now = time.monotonic()
+        n = len(self.upstreams)
+        for k in range(n):
+            upstream = self.upstreams[(index + k) % n]
+            if upstream.available(now):
+                return upstream
+        return self.upstreams[index % n]
+
+    def pick(self, index):
+        """Count a request on the upstream at ``index``, or the next available one, and return it."""
+        with self._lock:
+            return self._start(self._from(index))
+
+    def smooth_round_robin(self):
+        """
+        Count a request on the next upstream of the weighted rotation and
+        return it.
+
+        This is the smooth weighted round-robin of nginx: each upstream earns
+        its weight in credit at every pick, the one with the most credit is
+        chosen and pays back the total weight. Weights 5, 1, 1 give the order
+        a a b a c a a rather than a burst of five requests to the first
+        upstream.
+        """
+        with self._lock:
+            best = None
+            total = 0
+            for upstream in self._candidates():
+                upstream.current_weight += upstream.weight
+                total += upstream.weight
+                if best is None or upstream.current_weight > best.current_weight:
+                    best = upstream
+            best.current_weight -= total
+            return self._start(best)
+
+    def least_conn(self):
+        """
+        Count a request on the least loaded upstream and return it.
+
+        Load is ``in_flight / weight``. Ties go to the upstream that served
+        the fewest requests for its weight, then to the first configured one,
+        so the choice only depends on the counters.
+        """
+        with self._lock:
+            upstream = min(self._candidates(), key=lambda u: (
+                u.in_flight / u.weight, u.requests / u.weight, u.index))
+            return self._start(upstream)
+
+    def hash_pick(self, key):
+        """
+        Count a request on the upstream of ``key`` and return it.
+
+        The key hash is taken modulo the total weight, so each upstream owns
+        a share of the keys proportional to its weight. Changing the
+        upstreams remaps most keys; see :meth:`consistent_pick`.
+        """
+        with self._lock:
+            point = zlib.crc32(key.encode("utf-8")) % sum(u.weight for u in self.upstreams)
+            for upstream in self.upstreams:
+                point -= upstream.weight
+                if point < 0:
+                    return self._start(self._from(upstream.index))
+
+    def consistent_pick(self, key):
+        """
+        Count a request on the upstream owning ``key`` on the consistent hash
+        ring and return it.
+
+        Each upstream has ``RING_POINTS * weight`` points on the ring, derived
+        from its address only, so its points stay in place when other
+        upstreams are added or removed. A key belongs to the first point at
+        or after its own hash. The keys of an ejected upstream move to the
+        next available upstream clockwise, and come back once it is restored.
+        """
+        with self._lock:
+            if self._ring is None:
+                self._build_ring()
+            i = bisect.bisect_left(self._ring_points, ring_hash(key))
+            now = time.monotonic()
+            size = len(self._ring)
+            for k in range(size):
+                upstream = self._ring[(i + k) % size][1]
+                if upstream.available(now):
+                    return self._start(upstream)
+            return self._start(self._ring[i % size][1])
+
+    def _build_ring(self):
+        ring = []
+        for upstream in self.upstreams:
+            for i in range(RING_POINTS * upstream.weight // 4):
+                digest = hashlib.md5("{}-{}".format(upstream.address, i).encode("utf-8")).digest()
+                for j in range(4):
+                    point = int.from_bytes(digest[4 * j:4 * j + 4], "little")
+                    ring.append((point, upstream))
+        ring.sort(key=lambda item: (item[0], item[1].index))
+        self._ring = ring
+        self._ring_points = [point for point, _ in ring]
+
+    def release(self, upstream, ok=True):
+        """
+        Uncount a request chosen by this group once it has completed.
+
+        :param upstream (Upstream): The upstream the request went to.
+        :param ok (bool): False when the upstream failed to answer.
+        """
+        with self._lock:
+            upstream.in_flight -= 1
+            self._report(upstream, ok)
+
+    def report(self, upstream, ok):
+        """
+        Record the result of an active health probe.
+
+        A failed probe ejects the upstream at once. A successful one only
+        lifts an ejection caused by a probe and leaves the failures of real
+        requests alone, so a backend that answers the probe path but fails
+        requests is still ejected, and comes back through a half-open trial.
+        """
+        with self._lock:
+            if not ok:
+                upstream.probe_failed = True
+                self._eject(upstream)
+            elif upstream.probe_failed:
+                upstream.probe_failed = False
+                upstream.ejections = upstream.down_until = 0
+                print("[Balancer] Upstream {} restored".format(upstream.address))
+
+    def _report(self, upstream, ok):
+        upstream.trial = False
+        if ok:
+            if upstream.down_until:
+                print("[Balancer] Upstream {} restored".format(upstream.address))
+            upstream.failures = upstream.ejections = upstream.down_until = 0
+            upstream.probe_failed = False
+            return
+        upstream.failures += 1
+        # A failed half-open trial ejects again right away
+        if upstream.down_until or upstream.failures >= self.max_fails:
+            self._eject(upstream)
+
+    def _eject(self, upstream):
+        backoff = min(self.fail_timeout * 2 ** upstream.ejections, self.max_fail_timeout)
+        upstream.ejections += 1
+        upstream.failures = 0
+        upstream.down_until = time.monotonic() + backoff
+        print("[Balancer] Upstream {} ejected for {:.0f}s".format(upstream.address, backoff))
+
+    def __len__(self):
+        return len(self.upstreams)
+
+    def __repr__(self):
+        return "<UpstreamGroup {}>".format(", ".join(u.address for u in self.upstreams))
+
+
+class LoadBalancer:
+    """The :class:`UpstreamGroup` of each virtual host, created on first use.
+
+    Groups are only asked for the hosts of the routing table, so their
+    number is bounded by the configuration, not by the requests.
+
+    Attributes:
+        max_fails (int): Consecutive failed requests that eject an upstream.
+        fail_timeout (float): Seconds of the first ejection.
+        max_fail_timeout (float): Longest ejection.
+    """
+
+    def __init__(self, max_fails=MAX_FAILS, fail_timeout=FAIL_TIMEOUT,
+                 max_fail_timeout=MAX_FAIL_TIMEOUT):
+        self.max_fails = max_fails
+        self.fail_timeout = fail_timeout
+        self.max_fail_timeout = max_fail_timeout
+        self._groups = {}
+        self._lock = threading.Lock()
+
+    def group(self, hostname, servers):
+        """
+        Return the group of a configured virtual host.
+
+        The group is built again when the servers of the host change.
+
+        :param hostname (str): The virtual host, a key of the routing table.
+        :param servers (list): Its ``proxy_pass`` entries.
+        :rtype UpstreamGroup
+        """
+        servers = tuple(servers)
+        entry = self._groups.get(hostname)
+        if entry is None or entry[0] != servers:
+            with self._lock:
+                entry = self._groups.get(hostname)
+                if entry is None or entry[0] != servers:
+                    entry = (servers, UpstreamGroup(servers, self.max_fails, self.fail_timeout,
+                                                    self.max_fail_timeout))
+                    self._groups[hostname] = entry
+        return entry[1]
+
+    def groups(self, routes):
+        """
+        Return the group of every virtual host of a routing table.
+
+        :param routes (dict): ``hostname -> (proxy_map, policy)``.
+        :rtype list: ``(hostname, group)`` pairs.
+        """
+        groups = []
+        for hostname, (proxy_map, _) in routes.items():
+            servers = proxy_map if isinstance(proxy_map, list) else [proxy_map]
+            if servers:
+                groups.append((hostname, self.group(hostname, servers)))
+        return groups
+
+    def clear(self):
+        with self._lock:
+            self._groups.clear()
+
+
+#: Load balancing state of this proxy process.
+BALANCER = LoadBalancer()
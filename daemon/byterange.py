@@ -0,0 +1,125 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.byterange
+~~~~~~~~~~~~~~~~~
+
+This module provides byte range requests (RFC 7233) for static responses:
+parsing of the ``Range`` header, ``If-Range`` evaluation and the
+``multipart/byteranges`` framing used when several ranges are requested.
+
+Overlapping and adjacent ranges are coalesced, and a request asking for more
+than :data:`MAX_RANGES` ranges is served in full, which protects the server
+from requests splitting a file into many tiny parts.
+
+Usage Example:
+--------------
+>>> parse_range("bytes=0-99,-100", 1000)
+[(0, 99), (900, 999)]
+"""
+
+import uuid
+
+#: Largest number of ranges honoured in one request.
+MAX_RANGES = 16
+
+
+def parse_range(header, size):
+    """
+    Parse a ``Range`` header against a representation of ``size`` bytes.
+
+    :param header (str): The ``Range`` header value.
+    :param size (int): Size of the full representation.
+    :rtype list: Sorted, coalesced ``(first, last)`` byte positions (inclusive);
+                 an empty list when no range is satisfiable (416); None when
+                 the header must be ignored and the full content sent.
+    """
+    unit, sep, spec = header.partition("=")
+    if not sep or unit.strip().lower() != "bytes":
+        return None
+
+    ranges = []
+    for item in spec.split(","):
+        first, sep, last = item.strip().partition("-")
+        first, last = first.strip(), last.strip()
+        if not sep or (first and not first.isdigit()) or (last and not last.isdigit()):
+            return None
+        if not first:
+            # Suffix range: the last N bytes
+            if not last:
+                return None
+            length = int(last)
+            if length == 0 or size == 0:
+                continue
+            ranges.append((max(size - length, 0), size - 1))
+        else:
+            start = int(first)
+            if last and int(last) < start:
+                return None
+            if start >= size:
+                continue
+            end = int(last) if last else size - 1
+            ranges.append((start, min(end, size - 1)))
+
+    if len(ranges) > MAX_RANGES:
+        return None
+
+    ranges.sort()
+    merged = []
+    for start, end in ranges:
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def if_range_matches(header, etag, last_modified):
+    """
+    Evaluate an ``If-Range`` header.
+
+    The ranges apply only when the validator is the current strong ETag or
+    the exact ``Last-Modified`` date; otherwise the full content is sent.
+
+    :param header (str): The ``If-Range`` header value, or None.
+    :param etag (str): Current entity tag, or None.
+    :param last_modified (str): Current ``Last-Modified`` date, or None.
+    :rtype bool
+    """
+    if header is None:
+        return True
+    header = header.strip()
+    if header.startswith('"') or header.startswith("W/"):
+        return etag is not None and not etag.startswith("W/") and header == etag
+    return last_modified is not None and header == last_modified
+
+
+def content_range(first, last, size):
+    """Return the ``Content-Range`` value of one satisfied range."""
+    return "bytes {}-{}/{}".format(first, last, size)
+
+
+def new_boundary():
+    """Return a fresh ``multipart/byteranges`` boundary."""
+    return uuid.uuid4().hex
+
+
+def part_header(boundary, content_type, first, last, size):
+    """Return the delimiter and headers preceding one body part."""
+    return ("\r\n--{}\r\nContent-Type: {}\r\nContent-Range: {}\r\n\r\n".format(
+        boundary, content_type, content_range(first, last, size))).encode("latin-1")
+
+
+def closing_delimiter(boundary):
+    """Return the delimiter ending a ``multipart/byteranges`` body."""
+    return "\r\n--{}--\r\n".format(boundary).encode("latin-1")
@@ -0,0 +1,152 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.compression
+~~~~~~~~~~~~~~~~~
+
+This module provides ``Content-Encoding`` negotiation and compression of
+response bodies with gzip or deflate.
+
+Only bodies of an allowed MIME type and at least ``min_size`` bytes are
+compressed; images, video and small bodies are sent as they are. Static files
+are compressed once and the variant is kept by the static cache, and a
+precompressed ``<file>.gz`` sibling is served in place of the file when the
+client accepts gzip.
+
+Usage Example:
+--------------
+>>> coding = COMPRESSION.negotiate("gzip, deflate;q=0.5")
+>>> body = compress(body, coding, COMPRESSION.level)
+"""
+
+import gzip
+import zlib
+
+#: MIME types worth compressing.
+COMPRESSIBLE_TYPES = frozenset((
+    "text/html",
+    "text/css",
+    "text/plain",
+    "text/csv",
+    "text/xml",
+    "text/javascript",
+    "application/javascript",
+    "application/json",
+    "application/xml",
+    "image/svg+xml",
+))
+
+#: Smallest body compressed on the fly.
+MIN_SIZE = 512
+
+#: zlib compression level.
+COMPRESS_LEVEL = 6
+
+#: Content codings supported, in order of preference.
+CODINGS = ("gzip", "deflate")
+
+
+def compress(data, coding, level=COMPRESS_LEVEL):
+    """
+    Compress ``data`` with a content coding.
+
+    gzip output has a zero timestamp, so the same input always gives the same
+    bytes and the strong ETag of a cached variant stays valid.
+
+    :param data (bytes): The body.
+    :param coding (str): ``gzip`` or ``deflate`` (zlib format, as HTTP defines it).
+    :param level (int): zlib compression level.
+    :rtype bytes
+    """
+    if coding == "gzip":
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    if coding == "deflate":
+        return zlib.compress(data, level)
+    raise ValueError("Unsupported content coding '{}'".format(coding))
+
+
+def parse_accept_encoding(header):
+    """
+    Parse an ``Accept-Encoding`` header.
+
+    :rtype dict: ``coding -> q-value``, codings lower-cased.
+    """
+    accepted = {}
+    for item in header.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+class CompressionPolicy:
+    """Which responses are compressed, and how.
+
+    Attributes:
+        enabled (bool): Compress responses at all.
+        min_size (int): Smallest body compressed on the fly.
+        types (frozenset): MIME types compressed on the fly.
+        level (int): zlib compression level.
+        precompressed (bool): Serve ``.gz`` siblings of static files.
+    """
+
+    def __init__(self, enabled=True, min_size=MIN_SIZE, types=COMPRESSIBLE_TYPES,
+                 level=COMPRESS_LEVEL, precompressed=True):
+        self.enabled = enabled
+        self.min_size = min_size
+        self.types = frozenset(types)
+        self.level = level
+        self.precompressed = precompressed
+
+    def allows(self, content_type, size):
+        """Return True when a body of this type and size should be compressed."""
+        if not self.enabled or size < self.min_size:
+            return False
+        return content_type.partition(";")[0].strip().lower() in self.types
+
+    def negotiate(self, header, codings=CODINGS):
+        """
+        Choose the content coding of a response.
+
+        :param header (str): The ``Accept-Encoding`` header, or None.
+        :param codings (tuple): Codings available, in order of preference.
+        :rtype str: The coding to use, or None for the identity coding.
+        """
+        if not self.enabled or not header:
+            return None
+        accepted = parse_accept_encoding(header)
+        wildcard = accepted.get("*", 0.0)
+        best, best_q = None, 0.0
+        for coding in codings:
+            q = accepted.get(coding, wildcard)
+            if q > best_q:
+                best, best_q = coding, q
+        return best
+
+    def __repr__(self):
+        return "<CompressionPolicy {} min_size={} level={}>".format(
+            "on" if self.enabled else "off", self.min_size, self.level)
+
+
+#: Compression policy of this process.
+COMPRESSION = CompressionPolicy()
@@ -49,4 +49,44 @@ class CaseInsensitiveDict(MutableMapping):
         return iter(self.store)
 
     def __len__(self):
-        return len(self.store)
\ No newline at end of file
+        return len(self.store)
+
+class LazyCaseInsensitiveDict(CaseInsensitiveDict):
+    """A :class:`CaseInsensitiveDict <CaseInsensitiveDict>` view whose content
+    is produced by ``loader`` on first access and cached afterwards.
+
+    The loader returns a plain ``dict`` with lower-case keys. Code that never
+    reads the mapping never pays for building it.
+
+    Usage::
+
+      >>> headers = LazyCaseInsensitiveDict(lambda: {'host': 'app1.local'})
+      >>> headers.materialized
+      False
+      >>> headers['Host']
+      'app1.local'
+      >>> headers.materialized
+      True
+
+    """
+
+    def __init__(self, loader):
+        self._loader = loader
+        self._store = None
+
+    @property
+    def store(self):
+        if self._store is None:
+            loader, self._loader = self._loader, None
+            self._store = loader() if loader else {}
+        return self._store
+
+    @store.setter
+    def store(self, value):
+        self._loader = None
+        self._store = value
+
+    @property
+    def materialized(self):
+        """True once the content has been built."""
+        return self._store is not None
@@ -0,0 +1,73 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.eventloop
+~~~~~~~~~~~~~~~~~
+
+This module provides the shared event loop used to run coroutine route
+handlers (``async def``) from the threaded backend engine.
+
+The loop runs in one daemon thread per process and is started on first use.
+Worker threads submit coroutines to it and wait for their result, so all the
+``await`` points of every in-flight handler are multiplexed on that single
+loop: a handler can fan out to several peers with ``asyncio.gather`` without
+needing extra threads. The event-loop engine (:mod:`daemon.asyncbackend`)
+awaits coroutine handlers directly on its own loop instead.
+
+Usage Example:
+--------------
+>>> result = run_coroutine(handler(headers=headers, body=body))
+"""
+
+import asyncio
+import os
+import threading
+
+_loop = None
+_pid = None
+_lock = threading.Lock()
+
+
+def get_loop():
+    """
+    Return the shared event loop of this process, starting it if needed.
+
+    :rtype asyncio.AbstractEventLoop
+    """
+    global _loop, _pid
+    with _lock:
+        # A forked worker must not reuse the parent's loop thread.
+        if _loop is None or _pid != os.getpid():
+            _loop = asyncio.new_event_loop()
+            _pid = os.getpid()
+            t = threading.Thread(target=_loop.run_forever, name="weaprous-loop")
+            t.daemon = True
+            t.start()
+        return _loop
+
+
+def run_coroutine(coro, timeout=None):
+    """
+    Run ``coro`` on the shared event loop and block until it completes.
+
+    :param coro (coroutine): The awaitable returned by an ``async def`` handler.
+    :param timeout (float, optional): Seconds to wait for the result.
+    :raise: Whatever the coroutine raises.
+    :rtype: The value returned by the coroutine.
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, get_loop())
+    try:
+        return future.result(timeout)
+    except BaseException:
+        future.cancel()
+        raise
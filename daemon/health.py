@@ -0,0 +1,132 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.health
+~~~~~~~~~~~~~~~~~
+
+This module provides the active health checks of the proxy upstreams.
+
+A background thread sends ``GET <path>`` to every upstream of every virtual
+host each ``interval`` seconds, on a fresh connection with the ``Host`` of
+the virtual host. A ``2xx`` or ``3xx`` answer is healthy; an error status, a
+refused connection or a timeout ejects the upstream from its group, and the
+first healthy answer restores it. A healthy answer does not clear the
+failures of real requests: see :class:`UpstreamGroup` for the passive
+failure counting that works alongside the probes.
+
+Usage Example:
+--------------
+>>> HEALTH_CHECKER.interval = 5
+>>> HEALTH_CHECKER.path = "/css/styles.css"
+>>> HEALTH_CHECKER.start(routes)
+"""
+
+import os
+import socket
+import threading
+import time
+
+from .balancer import BALANCER
+
+#: Seconds between two probes of an upstream.
+HEALTH_INTERVAL = 5.0
+
+#: Path requested by the probes. A public page: a protected one answers
+#: with a redirect and opens a session for every probe.
+HEALTH_PATH = "/login.html"
+
+#: Seconds a probe may take to connect and answer.
+HEALTH_TIMEOUT = 2.0
+
+
+def probe(host, port, path=HEALTH_PATH, hostname="", timeout=HEALTH_TIMEOUT):
+    """
+    Send one health probe to an upstream.
+
+    :param host (str): Upstream host.
+    :param port (int): Upstream port.
+    :param path (str): Path requested.
+    :param hostname (str): ``Host`` header of the probe.
+    :param timeout (float): Seconds allowed to connect and answer.
+    :rtype bool: True when the upstream answered with a 2xx or 3xx status.
+    """
+    request = ("GET {} HTTP/1.1\r\nHost: {}\r\nConnection: close\r\n"
+               "User-Agent: WeApRous-health\r\n\r\n").format(path, hostname or host)
+    try:
+        with socket.create_connection((host, port), timeout=timeout) as sock:
+            sock.sendall(request.encode("latin-1"))
+            status = b""
+            while b"\r\n" not in status and len(status) < 1024:
+                chunk = sock.recv(1024)
+                if not chunk:
+                    break
+                status += chunk
+    except OSError:
+        return False
+    parts = status.split(b"\r\n", 1)[0].split(None, 2)
+    return len(parts) >= 2 and parts[1][:1] in (b"2", b"3")
+
+
+class HealthChecker:
+    """Periodic active probes of the upstreams of a routing table.
+
+    Attributes:
+        interval (float): Seconds between two rounds of probes, 0 to disable.
+        path (str): Path requested by the probes.
+        timeout (float): Seconds a probe may take.
+        balancer (LoadBalancer): Holds the groups the results are reported to.
+    """
+
+    def __init__(self, interval=HEALTH_INTERVAL, path=HEALTH_PATH, timeout=HEALTH_TIMEOUT,
+                 balancer=BALANCER):
+        self.interval = interval
+        self.path = path
+        self.timeout = timeout
+        self.balancer = balancer
+        self._pid = None
+
+    def check(self, routes):
+        """Probe every upstream of ``routes`` once and report the results."""
+        for hostname, group in self.balancer.groups(routes):
+            for upstream in group.upstreams:
+                ok = probe(upstream.host, upstream.port, self.path, hostname, self.timeout)
+                group.report(upstream, ok)
+
+    def start(self, routes):
+        """
+        Start the probe thread of this process, if ``interval`` is set.
+
+        Each pre-forked worker probes for itself, since the ejection state
+        it reports to is per process.
+        """
+        if not self.interval or self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        thread = threading.Thread(target=self._run, args=(routes,), name="health-check")
+        thread.daemon = True
+        thread.start()
+
+    def _run(self, routes):
+        while True:
+            try:
+                self.check(routes)
+            except (OSError, ValueError) as e:
+                print("[Health] Probe round failed: {}".format(e))
+            time.sleep(self.interval)
+
+    def __repr__(self):
+        return "<HealthChecker GET {} every {}s>".format(self.path, self.interval)
+
+
+#: Active health checker of this proxy process.
+HEALTH_CHECKER = HealthChecker()
@@ -20,7 +20,19 @@ from urllib import request
 from .request import Request
 from .response import Response
 from .dictionary import CaseInsensitiveDict
+from .httpreader import (RequestReader, HttpError, HEADER_END, MAX_HEADER_SIZE, MAX_BODY_SIZE,
+                         reject)
+from .eventloop import run_coroutine
+from .streaming import ChunkedBody, is_streamable
+import inspect
 import json
+import socket
+
+#: Seconds an idle keep-alive connection is kept open.
+KEEPALIVE_TIMEOUT = 5
+
+#: Maximum number of requests served on one persistent connection.
+MAX_KEEPALIVE_REQUESTS = 100
 
 class HttpAdapter:
     """
@@ -40,6 +52,11 @@ class HttpAdapter:
         routes (dict): Mapping of route paths to handler functions.
         request (Request): Request object for parsing incoming data.
         response (Response): Response object for building and sending replies.
+        keepalive_timeout (float): Idle seconds before a persistent connection is closed.
+        max_requests (int): Requests served on one connection before it is closed.
+        requests_served (int): Requests handled so far on the current connection.
+        max_header_size (int): Largest accepted request header block.
+        max_body_size (int): Largest accepted request body.
     """
 
     __attrs__ = [
@@ -50,9 +67,16 @@ class HttpAdapter:
         "routes",
         "request",
         "response",
+        "keepalive_timeout",
+        "max_requests",
+        "requests_served",
+        "max_header_size",
+        "max_body_size",
     ]
 
-    def __init__(self, ip, port, conn, connaddr, routes):
+    def __init__(self, ip, port, conn, connaddr, routes,
+                 keepalive_timeout=KEEPALIVE_TIMEOUT, max_requests=MAX_KEEPALIVE_REQUESTS,
+                 max_header_size=MAX_HEADER_SIZE, max_body_size=MAX_BODY_SIZE):
         """
         Initialize a new HttpAdapter instance.
 
@@ -61,6 +85,12 @@ class HttpAdapter:
         :param conn (socket): Active socket connection.
         :param connaddr (tuple): Address of the connected client.
         :param routes (dict): Mapping of route paths to handler functions.
+        :param keepalive_timeout (float): Idle seconds before a persistent
+                connection is closed.
+        :param max_requests (int): Requests served on one connection before
+                it is closed.
+        :param max_header_size (int): Largest accepted request header block.
+        :param max_body_size (int): Largest accepted request body.
         """
 
         #: IP address.
@@ -77,6 +107,15 @@ class HttpAdapter:
         self.request = Request()
         #: Response
         self.response = Response()
+        #: Idle timeout of persistent connections
+        self.keepalive_timeout = keepalive_timeout
+        #: Request limit of persistent connections
+        self.max_requests = max_requests
+        #: Requests served on this connection
+        self.requests_served = 0
+        #: Request size limits
+        self.max_header_size = max_header_size
+        self.max_body_size = max_body_size
 
     def handle_client(self, conn, addr, routes):
         """
@@ -84,7 +123,9 @@ class HttpAdapter:
 
         This method reads the request from the socket, prepares the request object,
         invokes the appropriate route handler if available, builds the response,
-        and sends it back to the client.
+        and sends it back to the client. The connection stays open for further
+        requests (HTTP keep-alive) until the client asks to close it, stays idle
+        longer than ``keepalive_timeout`` or reaches ``max_requests``.
 
         :param conn (socket): The client socket connection.
         :param addr (tuple): The client's address.
@@ -95,131 +136,258 @@ class HttpAdapter:
         self.conn = conn        
         # Connection address.
         self.connaddr = addr
+
+        conn.settimeout(self.keepalive_timeout)
+        reader = RequestReader(conn, self.max_header_size, self.max_body_size)
+
+        try:
+            while True:
+                # Read one complete request (header block and body)
+                try:
+                    msg = reader.read_request()
+                except socket.timeout:
+                    break
+                except HttpError as e:
+                    print("[HttpAdapter] Rejecting request from {}: {}".format(addr, e))
+                    reject(conn, Response().build_error(e.status_code, e.reason))
+                    break
+                if not msg:
+                    break
+
+                response = self.handle_request(msg, routes)
+                conn.sendall(response)
+                if self.response.stream is not None:
+                    self.response.stream.send(conn)
+
+                if not self.response.keep_alive:
+                    break
+        except socket.error as e:
+            print("[HttpAdapter] Connection error from {}: {}".format(addr, e))
+        finally:
+            conn.close()
+
+    def handle_request(self, msg, routes):
+        """
+        Process one raw HTTP request and return the serialized response.
+
+        This is the transport independent part of :meth:`handle_client`; the
+        threaded and the event-loop backends both call it once the full request
+        message has been read.
+
+        :param msg (bytes): The raw HTTP request message.
+        :param routes (dict): The route mapping for dispatching requests.
+        :rtype bytes: The full HTTP response (header and body).
+        """
+        response = self.begin_request(msg, routes)
+        if response is None:
+            if self.request.hook:
+                result = self.call_hook()
+                if inspect.isawaitable(result):
+                    # Coroutine handler: run it on the shared event loop
+                    result = run_coroutine(result)
+                self.apply_hook_result(result)
+            response = self.response.build_response(self.request)
+
+        if self.is_head():
+            stream = self.drop_body()
+            if isinstance(stream, ChunkedBody):
+                stream.close()
+            response = response[:response.find(HEADER_END) + len(HEADER_END)]
+        return response
+
+    async def handle_request_async(self, msg, routes):
+        """
+        Coroutine version of :meth:`handle_request` for the event-loop engine.
+
+        Coroutine handlers are awaited on the running loop; plain handlers
+        are called inline.
+
+        :param msg (bytes): The raw HTTP request message.
+        :param routes (dict): The route mapping for dispatching requests.
+        :rtype bytes: The full HTTP response (header and body).
+        """
+        response = self.begin_request(msg, routes)
+        if response is None:
+            if self.request.hook:
+                result = self.call_hook()
+                if inspect.isawaitable(result):
+                    result = await result
+                self.apply_hook_result(result)
+            response = self.response.build_response(self.request)
+
+        if self.is_head():
+            stream = self.drop_body()
+            if isinstance(stream, ChunkedBody):
+                await stream.aclose()
+            response = response[:response.find(HEADER_END) + len(HEADER_END)]
+        return response
+
+    def is_head(self):
+        """Return True when the current request is a ``HEAD`` request."""
+        return getattr(self.request, "method", None) == "HEAD"
+
+    def drop_body(self):
+        """
+        Detach the streamed body of a ``HEAD`` response.
+
+        The header block keeps the ``Content-Length``, ``ETag`` and other
+        headers of the matching ``GET``; only the body bytes are left out,
+        so the next response on a kept-alive connection starts right after
+        the header.
+
+        :rtype: The detached stream, or None.
+        """
+        stream = self.response.stream
+        self.response.stream = None
+        return stream
+
+    def begin_request(self, msg, routes):
+        """
+        Reset the per-request state and dispatch a new request.
+
+        :param msg (bytes): The raw HTTP request message.
+        :param routes (dict): The route mapping for dispatching requests.
+        :rtype bytes: A complete response when the request is answered
+                      without a hook, otherwise None.
+        """
+        # Fresh state for every request on a persistent connection
+        self.request = Request()
+        self.response = Response()
+        self.requests_served += 1
+
+        return self.dispatch(msg, routes)
+
+    def dispatch(self, msg, routes):
+        """
+        Prepare the :class:`Request <Request>` and run the middleware chain
+        compiled for its route (see :mod:`daemon.middleware`).
+
+        :param msg (bytes): The raw HTTP request message.
+        :param routes (Router): The route mapping for dispatching requests.
+        :rtype bytes: A complete response when the request is answered right
+                      away (405, or by a middleware), otherwise None.
+        """
         # Request handler
         req = self.request
         # Response handler
         resp = self.response
 
-        # Handle the request
-        msg = conn.recv(1024).decode()
         req.prepare(msg, routes)
 
-        # Handle request hook
-        if req.method == 'POST' and req.path == '/login':
-            body_params = {}
-            if req.body:
-                pairs = req.body.split('&')
-                for pair in pairs:
-                    key, val = pair.split('=', 1)
-                    body_params[key.strip()] = val.strip()
-            if body_params.get('username') == 'admin' and body_params.get('password') == 'password':
-                resp.status_code = 302
-                resp.headers['Set-Cookie'] = 'auth=true'
-                resp.headers["Location"] = "/index.html"
-                req.path='/index.html'
+        if self.wants_keep_alive(req) and self.requests_served < self.max_requests:
+            resp.keep_alive = True
+            resp.keep_alive_timeout = self.keepalive_timeout
+
+        # Known route requested with a method it does not accept
+        if not req.hook and req.allowed_methods:
+            resp.keep_alive = False
+            return resp.build_error(405, "Method Not Allowed",
+                                    {"Allow": ", ".join(req.allowed_methods)})
+
+        # Middleware compiled for the matched route, or for unrouted paths
+        chain = req.route.chain if req.route is not None else getattr(routes, "default_chain", None)
+        if chain:
+            result = chain(req, resp)
+            if result is not None:
+                self.apply_hook_result(result)
                 resp.authenticated = True
-            else:
-                resp.status_code = 401
-                resp.reason = 'Unauthorized'
-                resp._content = (
-                    b"<html><head><title>401 Unauthorized</title></head>"
-                    b"<body><h1>401 Unauthorized</h1><p>Invalid username or password.</p></body></html>"
-                )
-                header = (
-                    "HTTP/1.1 401 Unauthorized\r\n"
-                    "Content-Type: text/html\r\n"
-                    f"Content-Length: {len(resp._content)}\r\n"
-                    "Connection: close\r\n\r\n"
-                ).encode("utf-8")
-                conn.sendall(header + resp._content)
-                conn.close()
-                return 
-
-        elif req.method == 'GET':
-            cookies_string = req.headers.get('cookie', '')
-
-            # ============ FIX: ADD API ENDPOINTS TO PUBLIC PATHS ============
-            # Cho phép truy cập API endpoints và static files không cần auth
-            public_paths = (
-                "/login.html", 
-                "/css/", 
-                "/js/", 
-                "/images/", 
-                "/static/",
-                # API endpoints cho tracker
-                "/submit-info",
-                "/get-list",
-                "/connect-peer",
-                "/broadcast-peer",
-                "/send-peer"
-            )
-            
-            if req.path.startswith(public_paths) or req.path in public_paths:
-                resp.status_code = 200
-                resp.reason = "OK"
-                resp.authenticated = True  # Mark as authenticated to skip further checks
+                return resp.build_response(req)
 
-            # Nếu có cookie auth thì cho vào index
-            elif 'auth=true' in cookies_string:
-                if req.path == '/':
-                    req.path = '/index.html'
-                resp.status_code = 200
-                resp.reason = "OK"
-
-            # Còn lại thì bắt redirect về login
-            else:
-                req.path = "/login.html"
-                resp.status_code = 302
-                resp.reason = "Redirect to login"
-                resp.headers["Location"] = "/login.html"
-
-        # ============ FIX: HANDLE POST REQUESTS FOR API ============
-        elif req.method == 'POST':
-            # Bypass authentication for API endpoints
-            api_endpoints = ["/submit-info", "/connect-peer", "/broadcast-peer", "/send-peer"]
-            if req.path in api_endpoints:
-                resp.status_code = 200
-                resp.reason = "OK"
-                resp.authenticated = True
+        resp.authenticated = True
+        return None
 
+    def wants_keep_alive(self, req):
+        """
+        Decide whether the client wants the connection to persist.
 
-        if req.hook:
-            print("[HttpAdapter] hook in route-path METHOD {} PATH {}".format(req.hook._route_path,req.hook._route_methods))
-            
-            # ============ FIX: PROPERLY HANDLE HOOK RETURN VALUES ============
-            result = req.hook(headers=req.headers, body=req.body)
-            
-            # Handle tuple return (body, content_type) or (body, content_type, status_code)
-            if isinstance(result, tuple):
-                if len(result) == 2:
-                    body, content_type = result
-                    resp._content = body.encode('utf-8') if isinstance(body, str) else body
-                    resp.headers["Content-Type"] = content_type
-                    resp.status_code = 200
-                elif len(result) == 3:
-                    body, content_type, status_code = result
-                    resp._content = body.encode('utf-8') if isinstance(body, str) else body
-                    resp.headers["Content-Type"] = content_type
-                    resp.status_code = status_code
-            # Handle dict return
-            elif isinstance(result, dict):
-                resp._content = json.dumps(result).encode('utf-8')
-                resp.headers["Content-Type"] = "application/json"
-                resp.status_code = 200
-            # Handle string return
-            elif isinstance(result, str):
-                resp._content = result.encode('utf-8')
-                resp.status_code = 200
-            # Handle bytes return
-            elif isinstance(result, bytes):
-                resp._content = result
+        HTTP/1.1 connections are persistent unless the client sends
+        ``Connection: close``; HTTP/1.0 clients must opt in with
+        ``Connection: keep-alive``.
+
+        :param req (Request): The prepared request.
+        :rtype bool: True to keep the connection open after the response.
+        """
+        if not req.method:
+            return False
+        tokens = [t.strip().lower() for t in req.get_header("connection", "").split(",")]
+        if "close" in tokens:
+            return False
+        if req.version == "HTTP/1.1":
+            return True
+        return "keep-alive" in tokens
+
+    def call_hook(self):
+        """
+        Invoke the routed hook.
+
+        :rtype: The hook return value, or a coroutine for ``async def`` hooks.
+        """
+        req = self.request
+
+        print("[HttpAdapter] hook in route-path METHOD {} PATH {}".format(req.hook._route_path,req.hook._route_methods))
+
+        return req.hook(headers=req.headers, body=req.body, **req.params)
+
+    def apply_hook_result(self, result):
+        """
+        Convert a hook return value into the :class:`Response <Response>` content.
+
+        :param result: str, bytes, dict, a generator or (async) iterator of
+                       chunks, ``(body, content_type)`` or
+                       ``(body, content_type, status_code)``.
+        """
+        resp = self.response
+
+        # Handle tuple return (body, content_type) or (body, content_type, status_code)
+        if isinstance(result, tuple):
+            if len(result) == 2:
+                body, content_type = result
+                self.set_body(body)
+                resp.headers["Content-Type"] = content_type
                 resp.status_code = 200
+            elif len(result) == 3:
+                body, content_type, status_code = result
+                self.set_body(body)
+                resp.headers["Content-Type"] = content_type
+                resp.status_code = status_code
+        # Handle generator / iterator return, streamed as it is produced
+        elif is_streamable(result):
+            self.set_body(result)
+            resp.status_code = 200
+        # Handle dict return
+        elif isinstance(result, dict):
+            resp._content = json.dumps(result).encode('utf-8')
+            resp.headers["Content-Type"] = "application/json"
+            resp.status_code = 200
+        # Handle string return
+        elif isinstance(result, str):
+            resp._content = result.encode('utf-8')
+            resp.status_code = 200
+        # Handle bytes return
+        elif isinstance(result, bytes):
+            resp._content = result
+            resp.status_code = 200
+
+    def set_body(self, body):
+        """
+        Set the response body from a hook result.
 
-        # Build response
-        response = resp.build_response(req)
+        Generators and (async) iterators are not consumed here: they become a
+        :class:`ChunkedBody <daemon.streaming.ChunkedBody>` sent after the
+        header, chunked for HTTP/1.1 clients and delimited by closing the
+        connection for HTTP/1.0 ones.
 
-        conn.sendall(response)
-        conn.close()
+        :param body: str, bytes, or an iterable of chunks.
+        """
+        resp = self.response
+        if is_streamable(body):
+            chunked = self.request.version == "HTTP/1.1"
+            resp.stream = ChunkedBody(body, chunked)
+            resp._content = b""
+            if not chunked:
+                resp.keep_alive = False
+        else:
+            resp._content = body.encode('utf-8') if isinstance(body, str) else body
 
     @property
     def extract_cookies(self, req, resp):
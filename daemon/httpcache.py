@@ -0,0 +1,164 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.httpcache
+~~~~~~~~~~~~~~~~~
+
+This module provides HTTP caching for static responses: validators
+(``ETag``, ``Last-Modified``), conditional requests answered with
+``304 Not Modified`` and a per-prefix ``Cache-Control`` policy.
+
+Static files get a strong ETag built from their size and modification time,
+so it changes whenever the file does and costs no hashing. ``If-None-Match``
+is compared with the weak comparison of RFC 7232 and takes precedence over
+``If-Modified-Since``.
+
+Usage Example:
+--------------
+>>> CACHE_POLICY.set("/images/", 86400)
+>>> CACHE_POLICY.lookup("/images/welcome.png")
+'public, max-age=86400'
+"""
+
+import email.utils
+
+#: Default ``Cache-Control`` max-age per URL prefix, in seconds.
+DEFAULT_MAX_AGE = {
+    "/css/": 3600,
+    "/js/": 3600,
+    "/images/": 86400,
+    "/static/": 3600,
+}
+
+#: ``Cache-Control`` of responses not covered by a prefix: always revalidate.
+NO_CACHE = "no-cache"
+
+
+def make_etag(size, mtime_ns, weak=False):
+    """
+    Build an entity tag from the size and modification time of a file.
+
+    :param size (int): File size in bytes.
+    :param mtime_ns (int): Modification time in nanoseconds.
+    :param weak (bool): Build a weak (``W/``) tag.
+    :rtype str
+    """
+    tag = '"{:x}-{:x}"'.format(size, mtime_ns)
+    return "W/" + tag if weak else tag
+
+
+def http_date(timestamp):
+    """Format a POSIX timestamp as an HTTP date (IMF-fixdate)."""
+    return email.utils.formatdate(timestamp, usegmt=True)
+
+
+def parse_http_date(value):
+    """
+    Parse an HTTP date.
+
+    :rtype int: The POSIX timestamp, or None if ``value`` is not a valid date.
+    """
+    try:
+        return int(email.utils.parsedate_to_datetime(value).timestamp())
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+def etag_matches(header, etag):
+    """
+    Weak comparison of ``etag`` against an ``If-None-Match`` header value.
+
+    :param header (str): Comma separated list of entity tags, or ``*``.
+    :param etag (str): Current entity tag of the resource.
+    :rtype bool
+    """
+    if header.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == opaque:
+            return True
+    return False
+
+
+def is_not_modified(request, etag, last_modified):
+    """
+    Evaluate the conditional headers of a ``GET`` or ``HEAD`` request.
+
+    :param request (Request): The request.
+    :param etag (str): Current entity tag, or None.
+    :param last_modified (str): Current ``Last-Modified`` date, or None.
+    :rtype bool: True when the client copy is fresh and ``304`` applies.
+    """
+    if request.method not in ("GET", "HEAD"):
+        return False
+
+    if_none_match = request.get_header("if-none-match")
+    if if_none_match is not None:
+        return etag is not None and etag_matches(if_none_match, etag)
+
+    if_modified_since = request.get_header("if-modified-since")
+    if if_modified_since is not None and last_modified is not None:
+        if if_modified_since == last_modified:
+            return True
+        since = parse_http_date(if_modified_since)
+        mtime = parse_http_date(last_modified)
+        return since is not None and mtime is not None and mtime <= since
+    return False
+
+
+class CachePolicy:
+    """``Cache-Control`` values by URL prefix, longest prefix first.
+
+    Attributes:
+        default (str): Value for paths matching no prefix.
+    """
+
+    def __init__(self, max_age=None, default=NO_CACHE):
+        """
+        Initialize a new CachePolicy instance.
+
+        :param max_age (dict): ``prefix -> seconds``, defaults to :data:`DEFAULT_MAX_AGE`.
+        :param default (str): Value for paths matching no prefix.
+        """
+        self.default = default
+        self._rules = []
+        for prefix, seconds in (DEFAULT_MAX_AGE if max_age is None else max_age).items():
+            self.set(prefix, seconds)
+
+    def set(self, prefix, max_age):
+        """
+        Cache responses under ``prefix`` for ``max_age`` seconds; 0 means
+        ``no-cache``.
+        """
+        value = "public, max-age={}".format(int(max_age)) if max_age else NO_CACHE
+        self._rules = [(p, v) for p, v in self._rules if p != prefix]
+        self._rules.append((prefix, value))
+        self._rules.sort(key=lambda rule: len(rule[0]), reverse=True)
+
+    def lookup(self, path):
+        """Return the ``Cache-Control`` value for ``path``."""
+        for prefix, value in self._rules:
+            if path.startswith(prefix):
+                return value
+        return self.default
+
+    def __repr__(self):
+        return "<CachePolicy {}>".format(dict(self._rules))
+
+
+#: Policy applied to the static responses of this process.
+CACHE_POLICY = CachePolicy()
@@ -0,0 +1,120 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.httpheaders
+~~~~~~~~~~~~~~~~~
+
+This module provides the prebuilt pieces of response header blocks.
+
+The parts that only depend on the status and the content type (status line,
+``Server``, ``Content-Type``) are encoded once and kept as ``bytes``
+templates, the ``Date`` value is formatted at most once per second, and the
+``Connection`` lines are constants, so building a header block is a single
+``b"".join`` of a few ready-made pieces.
+
+Usage Example:
+--------------
+>>> b"".join([header_prefix(200, "OK", "application/json"),
+...           DATE, current_date(), CRLF, connection_header(True, 5), CRLF])
+"""
+
+import threading
+import time
+from email.utils import formatdate
+
+CRLF = b"\r\n"
+
+#: Name of the server, sent with every response.
+SERVER = "WeApRous/1.0"
+
+DATE = b"Date: "
+CONTENT_LENGTH = b"Content-Length: "
+TRANSFER_CHUNKED = b"Transfer-Encoding: chunked\r\n"
+
+#: Cache-Control lines of responses that must be revalidated.
+NO_CACHE_HEADERS = b"Cache-Control: no-cache\r\nPragma: no-cache\r\n"
+
+CONNECTION_CLOSE = b"Connection: close\r\n"
+
+#: Largest number of header templates kept.
+MAX_TEMPLATES = 256
+
+_templates = {}
+_connection = {}
+_date = (0, b"")
+_date_lock = threading.Lock()
+
+
+def current_date():
+    """
+    Return the current HTTP date as bytes.
+
+    The value is formatted again only when the second changes.
+
+    :rtype bytes
+    """
+    global _date
+    now = int(time.time())
+    second, value = _date
+    if second != now:
+        with _date_lock:
+            second, value = _date
+            if second != now:
+                value = formatdate(now, usegmt=True).encode("ascii")
+                _date = (now, value)
+    return value
+
+
+def header_prefix(status_code, reason, content_type):
+    """
+    Return the status line, ``Server`` and ``Content-Type`` headers as bytes.
+
+    :param status_code (int): HTTP status.
+    :param reason (str): Reason phrase.
+    :param content_type (str): ``Content-Type`` value.
+    :rtype bytes
+    """
+    key = (status_code, reason, content_type)
+    prefix = _templates.get(key)
+    if prefix is None:
+        prefix = "HTTP/1.1 {} {}\r\nServer: {}\r\nContent-Type: {}\r\n".format(
+            status_code, reason, SERVER, content_type).encode("utf-8")
+        if len(_templates) >= MAX_TEMPLATES:
+            # Content types set by hooks are unbounded; start over
+            _templates.clear()
+        _templates[key] = prefix
+    return prefix
+
+
+def connection_header(keep_alive, timeout=None):
+    """
+    Return the ``Connection`` (and ``Keep-Alive``) lines as bytes.
+
+    :param keep_alive (bool): Keep the connection open.
+    :param timeout (float): Idle timeout advertised to the client.
+    :rtype bytes
+    """
+    if not keep_alive:
+        return CONNECTION_CLOSE
+    value = _connection.get(timeout)
+    if value is None:
+        value = b"Connection: keep-alive\r\n"
+        if timeout:
+            value += "Keep-Alive: timeout={}\r\n".format(int(timeout)).encode("ascii")
+        _connection[timeout] = value
+    return value
+
+
+def header_line(name, value):
+    """Encode one ``name: value`` header line."""
+    return "{}: {}\r\n".format(name, value).encode("utf-8")
@@ -0,0 +1,273 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.httpreader
+~~~~~~~~~~~~~~~~~
+
+This module provides an incremental HTTP request reader. It accumulates bytes
+from a socket until the end of the header block, then reads exactly
+``Content-Length`` body bytes, so requests larger than one ``recv`` are never
+truncated and pipelined requests are kept for the next call.
+
+The reader owns one preallocated ``bytearray`` per connection and receives
+into it through a ``memoryview``; the buffer only grows when a request does
+not fit and is reused for every request of a persistent connection.
+
+Usage Example:
+--------------
+>>> reader = RequestReader(conn)
+>>> msg = reader.read_request()   # bytes, or None when the client closed
+"""
+
+import socket
+
+#: Header terminator of an HTTP message.
+HEADER_END = b"\r\n\r\n"
+
+#: Default size of the per-connection receive buffer.
+BUFFER_SIZE = 16 * 1024
+
+#: Largest accepted request line plus header block.
+MAX_HEADER_SIZE = 32 * 1024
+
+#: Largest accepted request body.
+MAX_BODY_SIZE = 16 * 1024 * 1024
+
+#: Seconds spent discarding unread input after an error response.
+LINGER_TIMEOUT = 1.0
+
+#: Interim response sent to clients waiting on ``Expect: 100-continue``.
+CONTINUE = b"HTTP/1.1 100 Continue\r\n\r\n"
+
+
+class HttpError(Exception):
+    """A malformed or oversized request that must be answered with an error
+    status before the connection is closed.
+
+    Attributes:
+        status_code (int): HTTP status to answer with.
+        reason (str): Reason phrase of the status.
+    """
+
+    def __init__(self, status_code, reason):
+        super().__init__("{} {}".format(status_code, reason))
+        self.status_code = status_code
+        self.reason = reason
+
+
+def header_value(header, name):
+    """
+    Return the value of the first header called ``name`` in a raw header block.
+
+    :param header (bytes): The request line and headers.
+    :param name (bytes): Lower-case header name.
+    :rtype bytes: The stripped value, or None when the header is absent.
+    """
+    for line in header.split(b"\r\n")[1:]:
+        key, sep, value = line.partition(b":")
+        if sep and key.strip().lower() == name:
+            return value.strip()
+    return None
+
+
+def body_length(header, max_body_size=MAX_BODY_SIZE):
+    """
+    Return the body size declared by a raw header block.
+
+    :param header (bytes): The request line and headers.
+    :param max_body_size (int): Largest accepted body.
+    :raise HttpError: invalid length, unsupported transfer coding or too large body.
+    :rtype int: The declared body size, 0 when there is no body.
+    """
+    coding = header_value(header, b"transfer-encoding")
+    if coding is not None and coding.lower() != b"identity":
+        raise HttpError(411, "Length Required")
+
+    value = header_value(header, b"content-length")
+    if value is None:
+        return 0
+    try:
+        length = int(value)
+    except ValueError:
+        raise HttpError(400, "Bad Request")
+    if length < 0:
+        raise HttpError(400, "Bad Request")
+    if length > max_body_size:
+        raise HttpError(413, "Payload Too Large")
+    return length
+
+
+def expects_continue(header):
+    """Return True when the client waits for ``100 Continue`` before the body."""
+    value = header_value(header, b"expect")
+    return value is not None and value.lower() == b"100-continue"
+
+
+def reject(conn, response):
+    """
+    Send an error response and close the connection gracefully.
+
+    The rest of the rejected request is usually still unread; closing the
+    socket right away would make the kernel answer with a reset that can
+    discard the error response before the client reads it. The write side is
+    shut down first and the pending input drained for a short while.
+
+    :param conn (socket): The client socket.
+    :param response (bytes): The serialized error response.
+    """
+    try:
+        conn.sendall(response)
+        conn.shutdown(socket.SHUT_WR)
+        conn.settimeout(LINGER_TIMEOUT)
+        while conn.recv(BUFFER_SIZE):
+            pass
+    except (socket.error, socket.timeout):
+        pass
+
+
+class RequestReader:
+    """Reads complete HTTP requests from a blocking socket.
+
+    Attributes:
+        conn (socket): The client socket.
+        max_header_size (int): Largest accepted header block.
+        max_body_size (int): Largest accepted body.
+    """
+
+    __attrs__ = [
+        "conn",
+        "max_header_size",
+        "max_body_size",
+    ]
+
+    def __init__(self, conn, max_header_size=MAX_HEADER_SIZE,
+                 max_body_size=MAX_BODY_SIZE, buffer_size=BUFFER_SIZE):
+        """
+        Initialize a new RequestReader instance.
+
+        :param conn (socket): The client socket.
+        :param max_header_size (int): Largest accepted header block.
+        :param max_body_size (int): Largest accepted body.
+        :param buffer_size (int): Initial size of the receive buffer.
+        """
+        self.conn = conn
+        self.max_header_size = max_header_size
+        self.max_body_size = max_body_size
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+        #: Start of the unread data in the buffer.
+        self._start = 0
+        #: End of the received data in the buffer.
+        self._end = 0
+
+    def read_request(self):
+        """
+        Read the next request from the connection.
+
+        :raise HttpError: the request is malformed or exceeds a size limit.
+        :raise socket.timeout: the socket timed out while waiting for data.
+        :rtype bytes: The raw request (header block and body), or None when
+                      the client closed the connection.
+        """
+        header = self.read_head()
+        if header is None:
+            return None
+
+        length = body_length(header, self.max_body_size)
+        if length and expects_continue(header) and self._end - self._start < length:
+            self.conn.sendall(CONTINUE)
+
+        while self._end - self._start < length:
+            if not self._fill(length):
+                return None
+
+        msg = header + bytes(self._view[self._start:self._start + length])
+        self._consume(length)
+        return msg
+
+    def read_head(self):
+        """
+        Read the request line and headers of the next request, leaving its
+        body unread for :meth:`iter_body`.
+
+        :raise HttpError: the header block exceeds ``max_header_size``.
+        :raise socket.timeout: the socket timed out while waiting for data.
+        :rtype bytes: The header block, terminator included, or None when
+                      the client closed the connection.
+        """
+        # Bytes already searched, counted from _start: _fill may move the
+        # unread bytes to the front of the buffer
+        scanned = 0
+        while True:
+            idx = self._buffer.find(HEADER_END, self._start + max(scanned - 3, 0), self._end)
+            if idx >= 0:
+                break
+            scanned = self._end - self._start
+            if self._end - self._start > self.max_header_size:
+                raise HttpError(431, "Request Header Fields Too Large")
+            if not self._fill(self.max_header_size + len(HEADER_END)):
+                return None
+
+        header_size = idx + len(HEADER_END) - self._start
+        if header_size > self.max_header_size:
+            raise HttpError(431, "Request Header Fields Too Large")
+
+        header = bytes(self._view[self._start:self._start + header_size])
+        self._consume(header_size)
+        return header
+
+    def iter_body(self, length):
+        """
+        Yield the next ``length`` body bytes as they arrive.
+
+        At most one buffer is held at a time, so a large body is relayed
+        without being read into memory first.
+
+        :param length (int): Body size, from :func:`body_length`.
+        :raise ConnectionError: the client closed the connection mid-body.
+        """
+        while length > 0:
+            if self._start == self._end and not self._fill(1):
+                raise ConnectionError("Client closed the connection mid-body")
+            size = min(length, self._end - self._start)
+            yield bytes(self._view[self._start:self._start + size])
+            self._consume(size)
+            length -= size
+
+    def _consume(self, size):
+        self._start += size
+        if self._start == self._end:
+            self._start = self._end = 0
+
+    def _fill(self, needed):
+        """
+        Receive more bytes into the buffer, making room for a request of
+        ``needed`` bytes first.
+
+        :rtype int: Number of bytes received, 0 at end of stream.
+        """
+        pending = self._end - self._start
+        if self._end == len(self._buffer):
+            if self._start:
+                # Move the unread bytes to the front of the buffer.
+                self._view[:pending] = self._view[self._start:self._end]
+                self._start, self._end = 0, pending
+            if self._end == len(self._buffer):
+                size = max(len(self._buffer) * 2, needed)
+                self._view.release()
+                self._buffer.extend(bytes(size - len(self._buffer)))
+                self._view = memoryview(self._buffer)
+
+        n = self.conn.recv_into(self._view[self._end:])
+        self._end += n
+        return n
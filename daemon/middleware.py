@@ -0,0 +1,226 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.middleware
+~~~~~~~~~~~~~~~~~
+
+This module provides the middleware pipeline of the backend.
+
+A middleware is a callable ``mw(req, resp)`` run before the route hook. It
+returns None to let the request continue, or a hook-like result (str, bytes,
+dict or a ``(body, content_type[, status_code])`` tuple) to answer the request
+right away. Middleware registered with ``auth=True`` is authentication: it is
+skipped on public routes. Any middleware can be skipped per route by name.
+
+The chain of every route is compiled once at startup by :func:`compile_routes`
+and stored on the :class:`Route <daemon.router.Route>` returned by the router,
+so a request only runs the middleware that applies to it, and public routes
+(tracker API, login page, static assets) never touch the session store.
+
+Usage Example:
+--------------
+>>> def log_request(req, resp):
+>>>     print("[App] {} {}".format(req.method, req.path))
+>>> app.use(log_request)
+>>> @app.route('/get-list', methods=['GET'], public=True)
+>>> def get_list(headers, body): ...
+"""
+
+from .router import Router
+
+#: Paths served without authentication, as ``(method, pattern)``.
+PUBLIC_PATHS = (
+    ("GET", "/login.html"),
+    ("GET", "/css/*"),
+    ("GET", "/js/*"),
+    ("GET", "/images/*"),
+    ("GET", "/static/*"),
+    ("POST", "/login"),
+)
+
+#: Demo credentials accepted by :func:`form_login`.
+LOGIN_USER = ("admin", "password")
+
+
+class Middleware:
+    """A named middleware callable.
+
+    Attributes:
+        func (callable): ``func(req, resp)``.
+        name (str): Name used by routes to opt out.
+        auth (bool): Authentication middleware, skipped on public routes.
+    """
+
+    __slots__ = ("func", "name", "auth")
+
+    def __init__(self, func, name=None, auth=False):
+        self.func = func
+        self.name = name or func.__name__
+        self.auth = auth
+
+    def __repr__(self):
+        return "<Middleware {}{}>".format(self.name, " (auth)" if self.auth else "")
+
+
+class MiddlewareChain:
+    """An ordered, immutable sequence of middleware callables."""
+
+    __slots__ = ("funcs", "names")
+
+    def __init__(self, middlewares=()):
+        self.funcs = tuple(m.func for m in middlewares)
+        self.names = tuple(m.name for m in middlewares)
+
+    def __call__(self, req, resp):
+        """
+        Run the chain until a middleware answers the request.
+
+        :rtype: The first non-None middleware result, or None.
+        """
+        for func in self.funcs:
+            result = func(req, resp)
+            if result is not None:
+                return result
+        return None
+
+    def __bool__(self):
+        return bool(self.funcs)
+
+    def __repr__(self):
+        return "<MiddlewareChain {}>".format(" -> ".join(self.names) or "empty")
+
+
+def form_login(req, resp):
+    """
+    Handle the ``POST /login`` form of ``www/login.html``.
+
+    Valid credentials get the ``auth=true`` cookie and a redirect to the index
+    page; the request then continues to the ``/login`` hook, if any. Invalid
+    credentials are answered with 401.
+    """
+    if req.method != "POST" or req.path != "/login":
+        return None
+
+    body_params = {}
+    if req.body:
+        for pair in req.text.split("&"):
+            if "=" in pair:
+                key, val = pair.split("=", 1)
+                body_params[key.strip()] = val.strip()
+
+    if (body_params.get("username"), body_params.get("password")) == LOGIN_USER:
+        resp.status_code = 302
+        resp.reason = "Found"
+        resp.headers["Set-Cookie"] = "auth=true"
+        resp.headers["Location"] = "/index.html"
+        req.path = "/index.html"
+        return None
+
+    return (
+        b"<html><head><title>401 Unauthorized</title></head>"
+        b"<body><h1>401 Unauthorized</h1><p>Invalid username or password.</p></body></html>",
+        "text/html",
+        401,
+    )
+
+
+def session_auth(req, resp):
+    """
+    Require an authenticated client.
+
+    ``GET`` and ``HEAD`` requests carrying the ``auth=true`` cookie are
+    allowed; other ``GET`` and ``HEAD`` requests are redirected to the
+    login page, which opens a new session. Other methods need a valid
+    ``sessionid`` cookie or an ``Authorization`` header, and are answered
+    with 401 otherwise.
+    """
+    cookie_header = req.get_header("cookie", "")
+
+    if req.method in ("GET", "HEAD"):
+        if "auth=true" in cookie_header:
+            return None
+        if not resp.validate_session(cookie_header):
+            sid = resp.create_session("admin")
+            resp.headers["Set-Cookie"] = "sessionid={}; Path=/; HttpOnly".format(sid)
+        # Serve the login page in place of the requested resource
+        req.hook = None
+        req.path = "/login.html"
+        resp.status_code = 302
+        resp.reason = "Redirect to login"
+        resp.headers["Location"] = "/login.html"
+        return None
+
+    valid_sid = resp.validate_session(cookie_header)
+    if valid_sid:
+        print("[Middleware] Valid session found: {}".format(valid_sid))
+        return None
+    if req.get_header("authorization"):
+        return None
+
+    print("[Middleware] No session or Authorization for {} {} -> 401".format(req.method, req.path))
+    return (
+        b"<html><head><title>401 Unauthorized</title></head>"
+        b"<body><h1>401 Unauthorized</h1></body></html>",
+        "text/html",
+        401,
+    )
+
+
+#: Middleware installed by default, in order.
+DEFAULT_MIDDLEWARE = (
+    Middleware(form_login),
+    Middleware(session_auth, auth=True),
+)
+
+
+def compile_chain(middlewares, public=False, skip=()):
+    """
+    Build the chain for one route.
+
+    :param middlewares (list): Ordered :class:`Middleware` objects.
+    :param public (bool): Leave out authentication middleware.
+    :param skip (tuple): Names of middleware to leave out.
+    :rtype MiddlewareChain
+    """
+    return MiddlewareChain([m for m in middlewares
+                            if not (public and m.auth) and m.name not in skip])
+
+
+def compile_routes(routes, middlewares=DEFAULT_MIDDLEWARE, public_paths=PUBLIC_PATHS):
+    """
+    Build the router and attach a compiled middleware chain to every route.
+
+    Chains with the same composition are shared between routes.
+
+    :param routes (dict|Router): Route mapping or router.
+    :param middlewares (list): Ordered :class:`Middleware` objects.
+    :param public_paths (list): ``(method, pattern)`` served without authentication.
+    :rtype Router: The compiled router. An already compiled router is returned as is.
+    """
+    if isinstance(routes, Router) and routes.compiled:
+        return routes
+
+    router = Router.from_routes(routes)
+    for method, pattern in public_paths:
+        router.add_public(method, pattern)
+
+    chains = {}
+    for route in router.routes.values():
+        key = (route.public, route.skip)
+        if key not in chains:
+            chains[key] = compile_chain(middlewares, route.public, route.skip)
+        route.chain = chains[key]
+
+    router.default_chain = compile_chain(middlewares)
+    router.compiled = True
+    return router
@@ -0,0 +1,249 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.prefork
+~~~~~~~~~~~~~~~~~
+
+This module provides a pre-fork supervisor that runs several copies of a
+server process on the same listening port, so that the backend and the proxy
+can use every CPU core instead of a single interpreter.
+
+Two ways of sharing the port are supported:
+
+- the supervisor binds the listening socket once and every forked worker
+  inherits it and calls ``accept`` on it (default, works everywhere ``fork``
+  exists);
+- with ``reuse_port=True`` every worker binds its own socket with
+  ``SO_REUSEPORT`` and the kernel balances new connections between them.
+
+The supervisor restarts crashed workers and, on ``SIGINT``/``SIGTERM``, stops
+all of them before returning.
+
+Usage Example:
+--------------
+>>> def serve(server):
+>>>     run_backend("0.0.0.0", 9000, {}, server=server)
+>>> run_prefork("0.0.0.0", 9000, 4, serve)
+
+"""
+
+import os
+import signal
+import socket
+import time
+
+#: Default listen backlog of the shared socket.
+BACKLOG = 50
+
+#: Seconds a worker must stay up to be considered started successfully.
+MIN_UPTIME = 1.0
+
+#: Upper bound of the restart delay of a crashing worker (seconds).
+MAX_RESTART_DELAY = 30.0
+
+#: Seconds given to the workers to exit before they are killed.
+SHUTDOWN_TIMEOUT = 5.0
+
+
+def create_listener(ip, port, reuse_port=False, backlog=BACKLOG):
+    """
+    Create a bound, listening TCP socket.
+
+    :param ip (str): IP address to bind.
+    :param port (int): Port number to listen on.
+    :param reuse_port (bool): Set ``SO_REUSEPORT`` so several processes can
+            bind the same address.
+    :param backlog (int): Listen backlog.
+    :rtype socket.socket: The listening socket.
+    """
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        if not hasattr(socket, "SO_REUSEPORT"):
+            raise OSError("SO_REUSEPORT is not supported on this platform")
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    server.bind((ip, port))
+    server.listen(backlog)
+    return server
+
+
+class Supervisor:
+    """Forks and watches a fixed number of worker processes.
+
+    Attributes:
+        ip (str): IP address the workers listen on.
+        port (int): Port number the workers listen on.
+        workers (int): Number of worker processes.
+        serve (callable): ``serve(server)`` runs a worker on a listening socket.
+        reuse_port (bool): Let each worker bind its own ``SO_REUSEPORT`` socket.
+        name (str): Label used in log messages.
+    """
+
+    __attrs__ = [
+        "ip",
+        "port",
+        "workers",
+        "serve",
+        "reuse_port",
+        "name",
+    ]
+
+    def __init__(self, ip, port, workers, serve, reuse_port=False, name="Prefork"):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if not hasattr(os, "fork"):
+            raise OSError("Pre-fork mode requires os.fork()")
+
+        self.ip = ip
+        self.port = port
+        self.workers = workers
+        self.serve = serve
+        self.reuse_port = reuse_port
+        self.name = name
+        #: pid -> worker slot
+        self.children = {}
+        self._started = {}
+        self._failures = [0] * workers
+        self._listener = None
+        self._stopping = False
+
+    def spawn(self, slot):
+        """
+        Fork the worker process of ``slot``.
+
+        :param slot (int): Index of the worker.
+        :rtype int: The pid of the new worker.
+        """
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            code = 0
+            try:
+                if self.reuse_port:
+                    server = create_listener(self.ip, self.port, reuse_port=True)
+                else:
+                    server = self._listener
+                print("[{}] Worker {} (pid {}) started".format(self.name, slot, os.getpid()))
+                self.serve(server)
+            except BaseException as e:
+                print("[{}] Worker {} failed: {}".format(self.name, slot, e))
+                code = 1
+            finally:
+                os._exit(code)
+
+        self.children[pid] = slot
+        self._started[pid] = time.monotonic()
+        return pid
+
+    def stop(self, *args):
+        """Ask every worker to terminate. Also used as the signal handler."""
+        self._stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def restart_delay(self, slot):
+        """Exponential backoff for a worker slot that keeps crashing."""
+        failures = self._failures[slot]
+        if failures == 0:
+            return 0.0
+        return min(MAX_RESTART_DELAY, 0.5 * (2 ** (failures - 1)))
+
+    def run(self):
+        """Fork the workers and supervise them until a shutdown is requested."""
+        if not self.reuse_port:
+            self._listener = create_listener(self.ip, self.port)
+
+        previous = {
+            signal.SIGINT: signal.signal(signal.SIGINT, self.stop),
+            signal.SIGTERM: signal.signal(signal.SIGTERM, self.stop),
+        }
+
+        print("[{}] Supervisor pid {} starting {} workers on port {}".format(
+            self.name, os.getpid(), self.workers, self.port))
+        try:
+            for slot in range(self.workers):
+                self.spawn(slot)
+
+            while self.children:
+                try:
+                    pid, status = os.waitpid(-1, 0)
+                except ChildProcessError:
+                    break
+
+                slot = self.children.pop(pid, None)
+                started = self._started.pop(pid, None)
+                if slot is None or self._stopping:
+                    continue
+
+                code = os.waitstatus_to_exitcode(status)
+                print("[{}] Worker {} (pid {}) exited with {}, restarting".format(
+                    self.name, slot, pid, code))
+
+                if started is not None and time.monotonic() - started < MIN_UPTIME:
+                    self._failures[slot] += 1
+                else:
+                    self._failures[slot] = 0
+                delay = self.restart_delay(slot)
+                if delay:
+                    time.sleep(delay)
+                if not self._stopping:
+                    self.spawn(slot)
+        finally:
+            self.stop()
+            self._reap()
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+            if self._listener:
+                self._listener.close()
+            print("[{}] Supervisor stopped".format(self.name))
+
+    def _reap(self):
+        deadline = time.monotonic() + SHUTDOWN_TIMEOUT
+        while self.children and time.monotonic() < deadline:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.children.clear()
+                return
+            if pid == 0:
+                time.sleep(0.05)
+                continue
+            self.children.pop(pid, None)
+
+        for pid in list(self.children):
+            print("[{}] Killing unresponsive worker pid {}".format(self.name, pid))
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+        self.children.clear()
+
+
+def run_prefork(ip, port, workers, serve, reuse_port=False, name="Prefork"):
+    """
+    Entry point for running ``workers`` forked copies of ``serve``.
+
+    :param ip (str): IP address to bind.
+    :param port (int): Port number to listen on.
+    :param workers (int): Number of worker processes.
+    :param serve (callable): ``serve(server)`` runs one worker on a listening socket.
+    :param reuse_port (bool): Bind one ``SO_REUSEPORT`` socket per worker
+            instead of sharing an inherited socket.
+    :param name (str): Label used in log messages.
+    """
+    Supervisor(ip, port, workers, serve, reuse_port, name).run()
@@ -25,6 +25,9 @@ Requirement:
 - response: customized :class: `Response <Response>` utilities.
 - httpadapter: :class: `HttpAdapter <HttpAdapter >` adapter for HTTP request processing.
 - dictionary: :class: `CaseInsensitiveDict <CaseInsensitiveDict>` for managing headers and cookies.
+- upstream: :class: `ConnectionPool <ConnectionPool>` of keep-alive connections to the backends.
+- balancer: :class: `UpstreamGroup <UpstreamGroup>` per host, with in-flight counters.
+- health: :class: `HealthChecker <HealthChecker>` active probes of the upstreams.
 
 """
 import socket
@@ -32,7 +35,14 @@ import threading
 from .response import *
 from .httpadapter import HttpAdapter
 from .dictionary import CaseInsensitiveDict
+from .httpreader import (RequestReader, HttpError, HEADER_END, CONTINUE, body_length,
+                         expects_continue, header_value, reject)
 import random
+import re
+from .prefork import run_prefork
+from .upstream import UPSTREAM_POOL, UpstreamError
+from .balancer import BALANCER
+from .health import HEALTH_CHECKER
 
 #: A dictionary mapping hostnames to backend IP and port tuples.
 #: Used to determine routing targets for incoming requests.
@@ -43,103 +53,260 @@ PROXY_PASS = {
 }
 
 
-def forward_request(host, port, request):
+#: Hop-by-hop headers that apply to one connection and are not forwarded.
+HOP_BY_HOP = (b"connection", b"keep-alive", b"proxy-connection")
+
+#: Methods that may be sent again after a stale pooled connection failed.
+IDEMPOTENT_METHODS = (b"GET", b"HEAD", b"OPTIONS", b"PUT", b"DELETE", b"TRACE")
+
+
+def with_connection(message, value):
+    """
+    Replace the hop-by-hop headers of a message with a ``Connection`` header.
+
+    Requests go upstream with ``Connection: keep-alive`` so the connection can
+    return to the pool, while responses go to the client with the value that
+    matches what the proxy does with the client connection.
+
+    :params message (bytes): HTTP request or response, header block first.
+    :params value (bytes): the new ``Connection`` value.
+    :rtype bytes: the message with a single ``Connection`` header.
+    """
+    head, sep, body = message.partition(HEADER_END)
+    lines = [line for line in head.split(b"\r\n")
+             if line.split(b":", 1)[0].strip().lower() not in HOP_BY_HOP]
+    lines.append(b"Connection: " + value)
+    return b"\r\n".join(lines) + HEADER_END + body
+
+
+#: Response sent when the host has no backend.
+NOT_FOUND = (
+    "HTTP/1.1 404 Not Found\r\n"
+    "Content-Type: text/plain\r\n"
+    "Content-Length: 13\r\n"
+    "Connection: close\r\n"
+    "\r\n"
+    "404 Not Found"
+).encode('utf-8')
+
+#: Response sent when the backend could not be reached or failed.
+BAD_GATEWAY = (
+    "HTTP/1.1 502 Bad Gateway\r\n"
+    "Content-Type: text/plain\r\n"
+    "Content-Length: 15\r\n"
+    "Connection: close\r\n"
+    "\r\n"
+    "502 Bad Gateway"
+).encode('utf-8')
+
+
+class ClientClosed(Exception):
+    """The client connection failed while a request was being relayed."""
+
+
+def client_chunks(body):
+    """Iterate a request body read from the client, tagging client socket errors."""
+    chunks = iter(body)
+    while True:
+        try:
+            chunk = next(chunks)
+        except StopIteration:
+            return
+        except socket.error as e:
+            raise ClientClosed(e)
+        yield chunk
+
+
+def send_client(client, data):
+    """Send bytes to the client, tagging client socket errors."""
+    try:
+        client.sendall(data)
+    except socket.error as e:
+        raise ClientClosed(e)
+
+
+def forward_request(host, port, head, body, client, pool=UPSTREAM_POOL):
     """
-    Forwards an HTTP request to a backend server and retrieves the response.
+    Relays an HTTP request to a backend server and streams its response
+    back to the client.
+
+    The request goes upstream over a pooled keep-alive connection: the
+    header block first, then the body as it is read from the client. The
+    response is sent to the client as it arrives, up to the end of its
+    ``Content-Length`` or chunked framing. Each direction holds at most one
+    receive buffer, and the blocking sends make a slow reader stall its
+    writer instead of growing a buffer. A reused connection that the backend
+    closed before answering is retried once on a fresh connection for
+    idempotent requests without a body.
 
     :params host (str): IP address of the backend server.
     :params port (int): port number of the backend server.
-    :params request (str): incoming HTTP request.
+    :params head (bytes): request line and headers of the incoming request.
+    :params body (iterable): chunks of the request body, read from the client.
+    :params client (socket.socket): client connection socket.
+    :params pool (ConnectionPool): pool of the upstream connections.
+
+    :rtype bool: False when the backend could not be reached or failed
+                 mid-response. The client gets a 502 Bad Gateway response
+                 if nothing was sent to it yet.
+    """
 
-    :rtype bytes: Raw HTTP response from the backend server. If the connection
-                  fails, returns a 404 Not Found response.
+    method = head.split(b" ", 1)[0]
+    head = with_connection(head, b"keep-alive")
+
+    retry = True
+    while True:
+        conn = None
+        response = None
+        reused = False
+        pulled = False
+        try:
+            conn = pool.acquire(host, port)
+            reused = conn.requests > 0
+            conn.requests += 1
+            conn.sock.sendall(head)
+            for chunk in client_chunks(body):
+                pulled = True
+                conn.sock.sendall(chunk)
+            response = conn.read_head()
+            send_client(client, with_connection(response, b"close"))
+            for chunk in conn.iter_body(response, method):
+                send_client(client, chunk)
+            pool.release(conn, conn.reusable)
+            return True
+        except ClientClosed as e:
+            print("[Proxy] Client went away: {}".format(e))
+            pool.release(conn, False)
+            return True
+        except (UpstreamError, socket.error) as e:
+            if conn is not None:
+                pool.release(conn, False)
+            if (retry and reused and response is None and not pulled
+                    and method in IDEMPOTENT_METHODS):
+                retry = False
+                continue
+            print("Socket error: {}".format(e))
+            if response is None:
+                try:
+                    client.sendall(BAD_GATEWAY)
+                except socket.error:
+                    pass
+            return False
+
+
+def request_variable(name, head, addr):
     """
+    Evaluate a ``$variable`` of a ``hash`` policy key for a request.
 
-    backend = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    Supported variables are ``$remote_addr``, ``$host``, ``$request_uri``,
+    ``$cookie_<name>`` and ``$http_<header>`` (dashes written as
+    underscores). Any other text is used as it is.
 
-    try:
-        backend.connect((host, port))
-        backend.sendall(request.encode())
-        response = b""
-        while True:
-            chunk = backend.recv(4096)
-            if not chunk:
-                break
-            response += chunk
-        return response
-    except socket.error as e:
-      print("Socket error: {}".format(e))
-      return (
-            "HTTP/1.1 404 Not Found\r\n"
-            "Content-Type: text/plain\r\n"
-            "Content-Length: 13\r\n"
-            "Connection: close\r\n"
-            "\r\n"
-            "404 Not Found"
-        ).encode('utf-8')
+    :params name (str): the variable, ``$`` included.
+    :params head (bytes): request line and headers.
+    :params addr (tuple): client address (IP, port).
+    :rtype str: the value, empty when the request does not carry it.
+    """
+    if name == "$remote_addr":
+        return addr[0] if addr else ""
+    if name == "$request_uri":
+        parts = head.split(b"\r\n", 1)[0].split(b" ")
+        return parts[1].decode("latin-1") if len(parts) > 1 else ""
+    if name == "$host":
+        name = "$http_host"
+    if name.startswith("$cookie_"):
+        cookies = header_value(head, b"cookie") or b""
+        wanted = name[len("$cookie_"):].encode("latin-1")
+        for cookie in cookies.split(b";"):
+            key, sep, value = cookie.strip().partition(b"=")
+            if sep and key == wanted:
+                return value.decode("latin-1")
+        return ""
+    if name.startswith("$http_"):
+        header = name[len("$http_"):].replace("_", "-").lower().encode("latin-1")
+        value = header_value(head, header)
+        return value.decode("latin-1") if value else ""
+    return name
+
+
+def hash_key(template, head, addr):
+    """
+    Build the key of a ``hash`` policy, e.g. ``$cookie_sessionid``.
 
+    A request without the key (no session cookie yet) is keyed by its
+    client address, so anonymous clients are spread over the pool rather
+    than all sent to the upstream of the empty key.
+    """
+    key = "".join(request_variable(token, head, addr) if token.startswith("$") else token
+                  for token in re.split(r"(\$[A-Za-z0-9_]+)", template))
+    return key or request_variable("$remote_addr", head, addr)
 
-def resolve_routing_policy(hostname, routes):
+
+def resolve_routing_policy(hostname, routes, addr=None, head=b""):
     """
     Handles an routing policy to return the matching proxy_pass.
     It determines the target backend to forward the request to.
 
-    :params host (str): IP address of the request target server.
-    :params port (int): port number of the request target server.
+    The chosen upstream is counted as busy in its group until the caller
+    hands it back with :meth:`UpstreamGroup.release`.
+
+    Policies are ``round-robin`` (weighted), ``least_conn``, ``random``,
+    ``ip_hash``, ``hash <key>`` and ``hash <key> consistent``.
+
+    :params hostname (str): Host header of the request.
     :params routes (dict): dictionary mapping hostnames and location.
+    :params addr (tuple): client address (IP, port), for the hash policies.
+    :params head (bytes): request line and headers, for the hash policies.
+    :rtype tuple: ``(group, upstream)``, the :class:`UpstreamGroup` of the
+                  host and the chosen :class:`Upstream`, or ``(None, None)``
+                  when the host is not configured.
     """
 
     print(hostname)
-    proxy_map, policy = routes.get(hostname,('127.0.0.1:9000','round-robin'))
+    route = routes.get(hostname)
+    if route is None:
+        # Only configured hosts get a group, so client Host values cannot grow the balancer
+        print("[Proxy] No virtual host for hostname {}".format(hostname))
+        return None, None
+    proxy_map, policy = route
     print (proxy_map)
     print (policy)
 
-    proxy_host = ''
-    proxy_port = '9000'
-
+    policy, *policy_args = policy.split()
     policy = policy.lower()
 
-    if isinstance(proxy_map, list):
-        if len(proxy_map) == 0:
-            print("[Proxy] Emtpy resolved routing of hostname {}".format(hostname))
-            print ("Empty proxy_map result")
-            return None, None
-            # TODO: implement the error handling for non mapped host
-            #       the policy is design by team, but it can be 
-            #       basic default host in your self-defined system
-            # Use a dummy host to raise an invalid connection
-
-            # proxy_host = '127.0.0.1'
-            # proxy_port = '9000'
-        elif len(proxy_map) == 1:
-            proxy_host, proxy_port = proxy_map[0].split(":", 1)
-        #elif: # apply the policy handling 
-        #   proxy_map
-        #   policy
+    if not isinstance(proxy_map, list):
+        print("[Proxy] resolve route of hostname {} is a singular to".format(hostname))
+        proxy_map = [proxy_map]
+
+    if len(proxy_map) == 0:
+        print("[Proxy] Emtpy resolved routing of hostname {}".format(hostname))
+        print ("Empty proxy_map result")
+        return None, None
+
+    group = BALANCER.group(hostname, proxy_map)
+
+    if len(group) == 1:
+        upstream = group.pick(0)
+    elif policy == "round-robin":
+        upstream = group.smooth_round_robin()
+    elif policy == "random":
+        upstream = group.pick(random.randrange(len(group)))
+    elif policy == "least_conn":
+        upstream = group.least_conn()
+    elif policy == "ip_hash":
+        upstream = group.consistent_pick(request_variable("$remote_addr", head, addr))
+    elif policy == "hash" and policy_args:
+        key = hash_key(policy_args[0], head, addr)
+        if "consistent" in policy_args[1:]:
+            upstream = group.consistent_pick(key)
         else:
-            # Out-of-handle mapped host
-            if policy == "round-robin":
-                if not hasattr(resolve_routing_policy, "rr_index"):
-                    resolve_routing_policy.rr_index = 0
-                index = resolve_routing_policy.rr_index % len(proxy_map)
-                resolve_routing_policy.rr_index += 1
-                proxy_host, proxy_port = proxy_map[index].split(":", 1)
-            
-            elif policy == "random":
-                proxy_host, proxy_port = random.choice(proxy_map).split(":", 1)
-            
-            elif policy == "least_conn":
-                proxy_host, proxy_port = proxy_map[0].split(":", 1)
-            
-            else:
-                print(f"[WARN] Unknown policy '{policy}', fallback to round-robin.")
-                proxy_host, proxy_port = proxy_map[0].split(":", 1)
-
+            upstream = group.hash_pick(key)
     else:
-        print("[Proxy] resolve route of hostname {} is a singular to".format(hostname))
-        proxy_host, proxy_port = proxy_map.split(":", 1)
+        print(f"[WARN] Unknown policy '{policy}', fallback to round-robin.")
+        upstream = group.smooth_round_robin()
 
-    return proxy_host, proxy_port
+    return group, upstream
 
 def handle_client(ip, port, conn, addr, routes):
     """
@@ -150,8 +317,9 @@ def handle_client(ip, port, conn, addr, routes):
     matches the hostname against known routes. In the matching
     condition,it forwards the request to the appropriate backend.
 
-    The handler sends the backend response back to the client or
-    returns 404 if the hostname is unreachable or is not recognized.
+    The handler streams the request body to the backend and the backend
+    response back to the client, or returns 404 if the hostname is
+    unreachable or is not recognized.
 
     :params ip (str): IP address of the proxy server.
     :params port (int): port number of the proxy server.
@@ -160,39 +328,53 @@ def handle_client(ip, port, conn, addr, routes):
     :params routes (dict): dictionary mapping hostnames and location.
     """
 
-    request = conn.recv(1024).decode()
+    reader = RequestReader(conn)
+    try:
+        head = reader.read_head()
+        length = body_length(head, reader.max_body_size) if head else 0
+    except HttpError as e:
+        print("[Proxy] Rejecting request from {}: {}".format(addr, e))
+        reject(conn, Response().build_error(e.status_code, e.reason))
+        conn.close()
+        return
+    except socket.error as e:
+        print("Socket error: {}".format(e))
+        conn.close()
+        return
+
+    if not head:
+        conn.close()
+        return
 
     # Extract hostname
-    for line in request.splitlines():
-        if line.lower().startswith('host:'):
-            hostname = line.split(':', 1)[1].strip()
+    host = header_value(head, b"host")
+    hostname = host.decode("latin-1") if host else ""
 
     print("[Proxy] {} at Host: {}".format(addr, hostname))
 
-    # Resolve the matching destination in routes and need conver port
-    # to integer value
-    resolved_host, resolved_port = resolve_routing_policy(hostname, routes)
-    try:
-        resolved_port = int(resolved_port)
-    except ValueError:
-        print("Not a valid integer")
+    # Resolve the matching destination in routes; the upstream stays
+    # counted as in flight until its response has been relayed
+    group, upstream = resolve_routing_policy(hostname, routes, addr, head)
 
-    if resolved_host:
-        print("[Proxy] Host name {} is forwarded to {}:{}".format(hostname,resolved_host, resolved_port))
-        response = forward_request(resolved_host, resolved_port, request)        
-    else:
-        response = (
-            "HTTP/1.1 404 Not Found\r\n"
-            "Content-Type: text/plain\r\n"
-            "Content-Length: 13\r\n"
-            "Connection: close\r\n"
-            "\r\n"
-            "404 Not Found"
-        ).encode('utf-8')
-    conn.sendall(response)
+    try:
+        if upstream:
+            print("[Proxy] Host name {} is forwarded to {}".format(hostname, upstream.address))
+            ok = True
+            try:
+                if length and expects_continue(head):
+                    conn.sendall(CONTINUE)
+                ok = forward_request(upstream.host, upstream.port, head,
+                                     reader.iter_body(length), conn)
+            finally:
+                # Failed requests count towards ejecting the upstream
+                group.release(upstream, ok)
+        else:
+            conn.sendall(NOT_FOUND)
+    except socket.error as e:
+        print("Socket error: {}".format(e))
     conn.close()
 
-def run_proxy(ip, port, routes):
+def run_proxy(ip, port, routes, server=None):
     """
     Starts the proxy server and listens for incoming connections. 
 
@@ -204,15 +386,20 @@ def run_proxy(ip, port, routes):
     :params ip (str): IP address to bind the proxy server.
     :params port (int): port number to listen on.
     :params routes (dict): dictionary mapping hostnames and location.
+    :params server (socket.socket): an already listening socket, as handed
+                                    to pre-forked workers.
 
     """
 
-    proxy = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    prebound = server is not None
+    proxy = server if prebound else socket.socket(socket.AF_INET, socket.SOCK_STREAM)
 
     try:
-        proxy.bind((ip, port))
-        proxy.listen(50)
+        if not prebound:
+            proxy.bind((ip, port))
+            proxy.listen(50)
         print("[Proxy] Listening on IP {} port {}".format(ip,port))
+        HEALTH_CHECKER.start(routes)
         while True:
             conn, addr = proxy.accept()
 
@@ -229,13 +416,20 @@ def run_proxy(ip, port, routes):
     except socket.error as e:
       print("Socket error: {}".format(e))
 
-def create_proxy(ip, port, routes):
+def create_proxy(ip, port, routes, workers=1, reuse_port=False):
     """
     Entry point for launching the proxy server.
 
     :params ip (str): IP address to bind the proxy server.
     :params port (int): port number to listen on.
     :params routes (dict): dictionary mapping hostnames and location.
+    :params workers (int): number of pre-forked proxy processes sharing the port.
+    :params reuse_port (bool): bind one SO_REUSEPORT socket per worker process.
     """
 
-    run_proxy(ip, port, routes)
+    if workers and workers > 1:
+        def serve(server):
+            run_proxy(ip, port, routes, server)
+        run_prefork(ip, port, workers, serve, reuse_port, name="Proxy")
+    else:
+        run_proxy(ip, port, routes)
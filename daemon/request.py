@@ -16,7 +16,38 @@ daemon.request
 This module provides a Request object to manage and persist 
 request settings (cookies, auth, proxies).
 """
-from .dictionary import CaseInsensitiveDict
+from urllib.parse import parse_qsl
+
+from .dictionary import CaseInsensitiveDict, LazyCaseInsensitiveDict
+from .router import Router
+
+#: Search keys of :meth:`Request.get_header`, cached per header name.
+_HEADER_NEEDLES = {}
+
+
+def parse_header_block(request, start, end):
+    """Parse ``request[start:end]`` into a dict keyed by lower-case names.
+
+    :param request (bytes): The raw request.
+    :param start (int): Offset of the first header line.
+    :param end (int): Offset of the end of the header block.
+    """
+    store = {}
+    for line in request[start:end].decode("latin-1").split("\r\n"):
+        key, sep, val = line.partition(":")
+        if sep:
+            store[key.strip().lower()] = val.strip()
+    return store
+
+
+def parse_cookie_header(cookies):
+    """Parse a ``Cookie`` header value into a dict keyed by lower-case names."""
+    store = {}
+    for kv in cookies.split(";"):
+        if "=" in kv:
+            k, v = kv.strip().split("=", 1)
+            store[k.lower()] = v
+    return store
 
 
 class Request:
@@ -25,6 +56,11 @@ class Request:
 
     Instances are generated from an incoming HTTP message
     and should not be instantiated manually.
+
+    Headers, cookies and query parameters are lazy views: they are parsed
+    from the raw message the first time they are read and cached afterwards,
+    so requests that never look at them do not pay for parsing them.
+    :meth:`get_header` reads a single header without building the whole map.
     """
 
     __attrs__ = [
@@ -34,8 +70,10 @@ class Request:
         "body",
         "reason",
         "cookies",
+        "query",
         "routes",
         "hook",
+        "params",
     ]
 
     def __init__(self):
@@ -44,24 +82,40 @@ class Request:
         #: HTTP URL or path.
         self.url = None
         self.path = None
+        #: Raw query string of the URL (without ``?``).
+        self.query_string = ""
         #: Dictionary of HTTP headers.
         self.headers = CaseInsensitiveDict()
         #: Cookies associated with the request.
         self.cookies = CaseInsensitiveDict()
-        #: Request body (bytes or string).
+        #: Request body (bytes).
         self.body = None
         #: Routes mapping (method, path) → handler.
         self.routes = {}
         #: Hook point for a routed mapped path.
         self.hook = None
+        #: Path parameters captured by the router.
+        self.params = {}
+        #: Matched router entry, carries the compiled middleware chain.
+        self.route = None
+        #: Methods of a routed path requested with another method (405).
+        self.allowed_methods = ()
         #: HTTP version.
         self.version = None
+        #: Raw message and end offset of its header block.
+        self._raw = None
+        self._head_end = 0
+        #: Lower-cased header block, built on the first :meth:`get_header`.
+        self._lower_head = None
+        self._query = None
 
-    def extract_request_line(self, request):
+    def extract_request_line(self, line):
+        """Split the request line into method, path and version.
+
+        :param line (bytes): The first line of the request, without CRLF.
+        """
         try:
-            lines = request.splitlines()
-            first_line = lines[0]
-            method, path, version = first_line.split()
+            method, path, version = line.decode("latin-1").split()
 
             if path == "/":
                 path = "/index.html"
@@ -70,45 +124,131 @@ class Request:
 
         return method, path, version
 
-    def prepare_headers(self, request):
-        """Prepares the given HTTP headers."""
-        lines = request.split("\r\n")
-        headers = {}
-        for line in lines[1:]:
-            if ": " in line:
-                key, val = line.split(": ", 1)
-                headers[key.lower()] = val
-        return CaseInsensitiveDict(headers)
+    def prepare_headers(self, request, start=0, end=None):
+        """Prepares the HTTP headers found in ``request[start:end]``.
+
+        Only the header block is decoded and split, never the request
+        line or the body.
+
+        :param request (bytes): The raw request.
+        :param start (int): Offset of the first header line.
+        :param end (int): Offset of the end of the header block.
+        """
+        if end is None:
+            end = len(request)
+        headers = CaseInsensitiveDict()
+        headers.store = parse_header_block(request, start, end)
+        return headers
+
+    def get_header(self, name, default=None):
+        """Return one header value without materializing :attr:`headers`.
+
+        :param name (str): Header name, any case.
+        :param default: Value returned when the header is absent.
+        """
+        headers = self.headers
+        if not isinstance(headers, LazyCaseInsensitiveDict) or headers.materialized \
+                or self._raw is None:
+            return headers.get(name, default)
+
+        raw = self._raw
+        block = self._lower_head
+        if block is None:
+            # Lower-cased once per request, then shared by every lookup
+            block = self._lower_head = raw[:self._head_end].lower()
+        needle = _HEADER_NEEDLES.get(name)
+        if needle is None:
+            needle = _HEADER_NEEDLES[name] = b"\r\n" + name.lower().encode("latin-1") + b":"
+        # Last occurrence, as parse_header_block keeps the last value of a repeated header
+        idx = block.rfind(needle)
+        if idx < 0:
+            return default
+        start = idx + len(needle)
+        end = raw.find(b"\r\n", start, self._head_end)
+        if end < 0:
+            end = self._head_end
+        return raw[start:end].strip().decode("latin-1")
+
+    @property
+    def query(self):
+        """Query parameters of the URL, parsed on first access."""
+        if self._query is None:
+            self._query = dict(parse_qsl(self.query_string, keep_blank_values=True))
+        return self._query
 
     def prepare(self, request, routes=None):
-        """Prepares the entire request with the given parameters."""
+        """Prepares the entire request with the given parameters.
+
+        The raw message is parsed in a single pass over ``bytes``: the request
+        line and the header block are located with ``find`` and the body is
+        kept as ``bytes`` (see :attr:`text` for the decoded form). Headers,
+        cookies and query parameters are only parsed when first read.
+
+        :param request (bytes): The raw HTTP request. ``str`` is accepted and
+                encoded as UTF-8.
+        :param routes (Router|dict): Compiled router, or a mapping of
+                (method, path) to handlers.
+        """
+        if isinstance(request, str):
+            request = request.encode("utf-8")
+
+        # Locate the request line and the header block
+        head_end = request.find(b"\r\n\r\n")
+        if head_end < 0:
+            head_end = len(request)
+            body_start = head_end
+        else:
+            body_start = head_end + 4
+        line_end = request.find(b"\r\n", 0, head_end)
+        if line_end < 0:
+            line_end = head_end
 
         # Extract request line
-        self.method, self.path, self.version = self.extract_request_line(request)
+        self.method, self.url, self.version = self.extract_request_line(request[:line_end])
+        self.path = self.url
+        if self.url and "?" in self.url:
+            self.path, _, self.query_string = self.url.partition("?")
+            if self.path == "/":
+                self.path = "/index.html"
         print(f"[Request] {self.method} path {self.path} version {self.version}")
 
         # Routing hook
         if routes:
             self.routes = routes
-            self.hook = routes.get((self.method, self.path))
+            if isinstance(routes, Router):
+                match = routes.match(self.method, self.path)
+                self.route = match.route
+                self.hook = match.handler
+                self.params = match.params
+                self.allowed_methods = match.allowed
+            else:
+                self.hook = routes.get((self.method, self.path))
 
-        # Parse headers
-        self.headers = self.prepare_headers(request)
+        # Lazy headers and cookies
+        self._raw = request
+        self._head_end = head_end
+        self._lower_head = None
+        self._query = None
+        self.headers = LazyCaseInsensitiveDict(
+            lambda: parse_header_block(request, line_end + 2, head_end))
+        self.cookies = LazyCaseInsensitiveDict(
+            lambda: parse_cookie_header(self.get_header("cookie", "")))
 
-        # Parse body (safe split)
-        body_pattern = "\r\n\r\n"
-        body = request.split(body_pattern, 1)[1] if body_pattern in request else ""
-        self.prepare_body(body)
-
-        # Parse cookies
-        cookies = self.headers.get("cookie", "")
-        if cookies:
-            self.cookies = self.prepare_cookies(cookies)
-        else:
-            self.cookies = CaseInsensitiveDict()
+        # Body stays bytes; its length was checked against Content-Length
+        # by the request reader.
+        self.body = request[body_start:]
 
         return self
 
+    @property
+    def text(self):
+        """The request body decoded as text (UTF-8, undecodable bytes replaced)."""
+        if self.body is None:
+            return ""
+        if isinstance(self.body, str):
+            return self.body
+        return bytes(self.body).decode("utf-8", errors="replace")
+
     def prepare_body(self, data, files=None, json=None):
         """Prepare and set the body content."""
         self.body = data
@@ -143,9 +283,6 @@ class Request:
     def prepare_cookies(self, cookies):
         """Parse and store the cookies header."""
         cookie_dict = CaseInsensitiveDict()
-        for kv in cookies.split(";"):
-            if "=" in kv:
-                k, v = kv.strip().split("=", 1)
-                cookie_dict[k] = v
+        cookie_dict.store = parse_cookie_header(cookies)
         self.headers["Cookie"] = cookies
         return cookie_dict
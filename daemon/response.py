@@ -1,16 +1,40 @@
 import datetime
 import os
 import mimetypes
+from http.client import responses
 from .dictionary import CaseInsensitiveDict
-import uuid   # === ADDED FOR COOKIE MANAGEMENT ===
+from .staticcache import STATIC_CACHE
+from .streaming import FileBody, CompositeBody, ChunkedBody
+from .httpcache import CACHE_POLICY, NO_CACHE, is_not_modified
+from .compression import COMPRESSION, compress
+from .httpheaders import (CRLF, DATE, CONTENT_LENGTH, TRANSFER_CHUNKED, NO_CACHE_HEADERS,
+                          current_date, header_prefix, header_line, connection_header)
+from .byterange import (parse_range, if_range_matches, content_range, new_boundary,
+                        part_header, closing_delimiter)
+from .session import SESSION_STORE
+from .staticindex import STATIC_INDEX
 
 BASE_DIR = ""
 
-# === ADDED FOR COOKIE MANAGEMENT ===
-SESSION_STORE = {}  # simple in-memory session store
+#: Headers describing the served file, sent on 200, 206 and 304 only.
+VALIDATOR_HEADERS = ("ETag", "Last-Modified", "Accept-Ranges")
+
+#: Further headers copied from ``Response.headers`` when set.
+EXTRA_HEADERS = ("Content-Range", "Content-Encoding", "Vary", "Set-Cookie", "Location")
 
 
 class Response():
+    #: Cache of static files, shared by every response of the process.
+    static_cache = STATIC_CACHE
+    #: Startup index of the static files, None to resolve paths on each request.
+    static_index = STATIC_INDEX
+    #: Session store (see :mod:`daemon.session`), shared by every response.
+    session_store = SESSION_STORE
+    #: Cache-Control policy of static files.
+    cache_policy = CACHE_POLICY
+    #: Content-Encoding policy.
+    compression = COMPRESSION
+
     __attrs__ = [
         "_content",
         "_header",
@@ -42,16 +66,19 @@ class Response():
         self.elapsed = datetime.timedelta(0)
         self.request = None
         self.authenticated = False  # === ADDED ===
+        #: Keep the connection open after this response.
+        self.keep_alive = False
+        #: Idle timeout advertised in the Keep-Alive header.
+        self.keep_alive_timeout = None
+        #: Body sent after the header instead of ``_content`` (large files).
+        self.stream = None
+        #: Static cache entry of the served file.
+        self.static_entry = None
 
     # === ADDED FOR COOKIE MANAGEMENT ===
     def create_session(self, user="guest"):
-        """Create a new session ID and store it in SESSION_STORE."""
-        session_id = str(uuid.uuid4())
-        SESSION_STORE[session_id] = {
-            "user": user,
-            "created_at": datetime.datetime.utcnow(),
-        }
-        return session_id
+        """Create a new session ID and store it in the session store."""
+        return self.session_store.create(user)
 
     def validate_session(self, cookie_header):
         """Validate cookie from request header."""
@@ -61,7 +88,7 @@ class Response():
         for p in parts:
             if "sessionid=" in p:
                 sid = p.strip().split("sessionid=")[1]
-                if sid in SESSION_STORE:
+                if self.session_store.get(sid) is not None:
                     return sid
         return False
 
@@ -92,7 +119,7 @@ class Response():
             self.headers['Content-Type'] = 'application/{}'.format(sub_type)
         elif main_type == "video":
             base_dir = BASE_DIR + "videos/"
-            self.headers["Content-Type"] = "videos/{}".format(sub_type)
+            self.headers["Content-Type"] = "video/{}".format(sub_type)
         elif main_type == "audio":
             base_dir = BASE_DIR + "audios/"
             self.headers["Content-Type"] = "audio/{}".format(sub_type)
@@ -108,11 +135,28 @@ class Response():
 
     def build_content(self, path, base_dir):
         filepath = os.path.join(base_dir, path.lstrip('/'))
+        return self.load_file(filepath, path)
+
+    def load_file(self, filepath, path):
+        """
+        Load a static file through the static cache.
+
+        :param filepath (str): Path of the file.
+        :param path (str): Requested URL path.
+        :rtype tuple: ``(length, content)``; the content is empty when the
+                      file is streamed with :attr:`stream`.
+        """
         print("[Response] serving the object at location {}".format(filepath))
         try:
-            with open(filepath, 'rb') as f:
-                content = f.read()
-            return len(content), content
+            entry = self.static_cache.get(filepath, self.headers.get("Content-Type", "text/html"))
+            self.static_entry = entry
+            self.headers.update(entry.headers)
+            self.headers["Cache-Control"] = self.cache_policy.lookup(path)
+            if entry.content is None:
+                # Too large to hold in memory: sendfile it after the header
+                self.stream = FileBody(filepath, 0, entry.size)
+                return entry.size, b""
+            return entry.size, entry.content
         except FileNotFoundError:
             print("[Response] File not found: {}".format(filepath))
             content = b"404 Not Found"
@@ -122,70 +166,65 @@ class Response():
             content = b"500 Internal Server Error"
             return len(content), content
 
+    def content_length(self):
+        """Return the size of the body, streamed or in memory, or None when
+        it is produced while being sent."""
+        if isinstance(self.stream, ChunkedBody):
+            return None
+        if self.stream is not None:
+            return len(self.stream)
+        return len(self._content) if self._content else 0
+
     def build_response_header(self, request):
-        reqhdr = request.headers
+        """
+        Build the header block of the response.
+
+        The status line, ``Server`` and ``Content-Type`` come from a prebuilt
+        template and the ``Date`` value is cached for the current second; the
+        block is assembled with a single join.
+
+        :param request (Request): The request being answered.
+        :rtype bytes
+        """
         rsphdr = self.headers
 
         if not self.status_code:
             self.status_code = 200
-            self.reason = "OK"
 
-        # ============ FIX: SKIP AUTH CHECK IF ALREADY AUTHENTICATED ============
-        if self.authenticated:
-            print("[Response] Request already authenticated, skipping auth check")
+        if not self.reason:
+            self.reason = responses.get(self.status_code, "")
+
+        parts = [
+            header_prefix(self.status_code, self.reason, rsphdr.get("Content-Type", "text/html")),
+            DATE, current_date(), CRLF,
+        ]
+        # No body follows a 304, whatever the length of the representation
+        if self.status_code != 304:
+            length = self.content_length()
+            if length is not None:
+                parts += [CONTENT_LENGTH, str(length).encode("ascii"), CRLF]
+            elif self.stream.chunked:
+                parts.append(TRANSFER_CHUNKED)
+
+        cache_control = rsphdr.get("Cache-Control", NO_CACHE)
+        if cache_control == NO_CACHE:
+            parts.append(NO_CACHE_HEADERS)
         else:
-            # === ADDED FOR COOKIE MANAGEMENT ===
-            cookie_header = reqhdr.get("Cookie", "")
-            valid_sid = self.validate_session(cookie_header)
-
-            auth_header = reqhdr.get("Authorization", None)
-            if valid_sid:
-                print(f"[Response] Valid session found: {valid_sid}")
-                self.auth = "Session"
-            elif auth_header:
-                self.auth = auth_header
-                print(f"[Response] Using provided Authorization: {auth_header}")
-            else:
-                # Cho phép static hoặc login không cần auth
-                if request.path.startswith(("/static/", "/css/", "/js/", "/images/")):
-                    self.auth = None
-                    print("[Response] Static resource → skipping auth check")
-                elif request.path in ["/login", "/login.html"]:
-                    self.auth = "Basic dXNlcjpwYXNz"
-                    print("[Response] No Authorization found, but /login path allowed")
-                    # Khi login → tạo session và gắn cookie
-                    sid = self.create_session("admin")
-                    rsphdr["Set-Cookie"] = f"sessionid={sid}; Path=/; HttpOnly"
-                else:
-                    self.status_code = 401
-                    self.reason = "Unauthorized"
-                    self.auth = None
-                    print("[Response] No Authorization found → returning 401 Unauthorized")
-
-        headers = {
-            "Date": datetime.datetime.utcnow().strftime("%a, %d %b %Y %H:%M:%S GMT"),
-            "Server": "WeApRous/1.0",
-            "Content-Type": rsphdr.get("Content-Type", "text/html"),
-            "Content-Length": str(len(self._content) if self._content else 0),
-            "Cache-Control": "no-cache",
-            "Pragma": "no-cache",
-            "Connection": "close",
-            "User-Agent": reqhdr.get("User-Agent", "WeApRousClient/1.0"),
-        }
-
-        # === ADDED FOR COOKIE MANAGEMENT ===
-        if "Set-Cookie" in rsphdr:
-            headers["Set-Cookie"] = rsphdr["Set-Cookie"]
-
-        if self.status_code == 302 and hasattr(self, "redirect_location"):
-            headers["Location"] = self.redirect_location
-
-        status_line = f"HTTP/1.1 {self.status_code} {self.reason}\r\n"
-        for k, v in headers.items():
-            status_line += f"{k}: {v}\r\n"
-        status_line += "\r\n"
-
-        return status_line.encode("utf-8")
+            parts.append(header_line("Cache-Control", cache_control))
+        parts.append(connection_header(self.keep_alive, self.keep_alive_timeout))
+
+        # Validators of the served file, not of a redirect or an error page
+        if self.status_code in (200, 206, 304):
+            names = VALIDATOR_HEADERS + EXTRA_HEADERS
+        else:
+            names = EXTRA_HEADERS
+        for name in names:
+            value = rsphdr.get(name)
+            if value is not None:
+                parts.append(header_line(name, value))
+
+        parts.append(CRLF)
+        return b"".join(parts)
 
     def build_notfound(self):
         return (
@@ -199,14 +238,53 @@ class Response():
             "404 Not Found"
         ).encode('utf-8')
 
+    def build_error(self, status_code, reason, headers=None):
+        body = "{} {}".format(status_code, reason)
+        extra = "".join("{}: {}\r\n".format(k, v) for k, v in (headers or {}).items())
+        return (
+            "HTTP/1.1 {} {}\r\n"
+            "Content-Type: text/plain\r\n"
+            "Content-Length: {}\r\n"
+            "{}"
+            "Connection: close\r\n"
+            "\r\n"
+            "{}"
+        ).format(status_code, reason, len(body), extra, body).encode('utf-8')
+
+    def build_unavailable(self, retry_after=1):
+        return (
+            "HTTP/1.1 503 Service Unavailable\r\n"
+            "Content-Type: text/plain\r\n"
+            "Content-Length: 23\r\n"
+            "Retry-After: {}\r\n"
+            "Connection: close\r\n"
+            "\r\n"
+            "503 Service Unavailable"
+        ).format(retry_after).encode('utf-8')
+
     def build_response(self, request):
-        # ============ FIX: IF CONTENT ALREADY SET BY HOOK, JUST BUILD HEADER ============
-        if self._content and self.authenticated:
+        # Content already set by a hook or a middleware: just build the header
+        if self._content is not False and self.authenticated:
             print("[Response] Content already set by hook, building header only")
+            self.encode_content(request)
             self._header = self.build_response_header(request)
             return self._header + self._content
 
         path = request.path
+
+        # Indexed static files: one lookup, no filesystem access for misses
+        index = self.static_index
+        if index is not None and index.ready:
+            asset = index.lookup(path)
+            if asset is not None:
+                self.headers.update(asset.headers)
+                c_len, self._content = self.load_file(asset.path, path)
+                return self.build_static_response(request)
+            if index.covers(path):
+                print("[Response] {} path {} not in the static index".format(request.method, path))
+                self.keep_alive = False
+                return self.build_notfound()
+
         mime_type = self.get_mime_type(path)
         print("[Response] {} path {} mime_type {}".format(request.method, request.path, mime_type))
 
@@ -222,9 +300,147 @@ class Response():
             base_dir = self.prepare_content_type(mime_type)
         elif mime_type.startswith('video/'):
             base_dir = self.prepare_content_type(mime_type)
+        elif mime_type.startswith('audio/'):
+            base_dir = self.prepare_content_type(mime_type)
         else:
+            self.keep_alive = False
             return self.build_notfound()
 
         c_len, self._content = self.build_content(path, base_dir)
+        return self.build_static_response(request)
+
+    def build_static_response(self, request):
+        """
+        Finish the response of a loaded static file: content coding,
+        conditional GET and byte ranges, then the header.
+
+        :param request (Request): The request.
+        :rtype bytes: The header and the in-memory part of the body.
+        """
+        # Ranges apply to the identity coding only
+        if self.static_entry is not None and request.get_header("range") is None:
+            self.encode_static(request)
+
+        # Conditional GET: the client copy is still fresh
+        if self.status_code in (None, 200) and "ETag" in self.headers:
+            if is_not_modified(request, self.headers["ETag"], self.headers.get("Last-Modified")):
+                self.status_code = 304
+                self.reason = "Not Modified"
+                self._content = b""
+                self.stream = None
+            elif "Content-Encoding" not in self.headers:
+                self.apply_range(request)
+
         self._header = self.build_response_header(request)
-        return self._header + self._content
\ No newline at end of file
+        return self._header + self._content
+
+    def encode_content(self, request):
+        """
+        Compress a hook response when the client accepts it and the content
+        type and size are allowed by the compression policy.
+
+        :param request (Request): The request.
+        """
+        content = self._content
+        if not content or "Content-Encoding" in self.headers:
+            return
+        if not self.compression.allows(self.headers.get("Content-Type", "text/html"), len(content)):
+            return
+        self.headers["Vary"] = "Accept-Encoding"
+        coding = self.compression.negotiate(request.get_header("accept-encoding"))
+        if coding is None:
+            return
+        data = compress(content, coding, self.compression.level)
+        if len(data) < len(content):
+            self._content = data
+            self.headers["Content-Encoding"] = coding
+
+    def encode_static(self, request):
+        """
+        Select the compressed variant of a static file accepted by the client.
+
+        The variant comes from the static cache: it is built once per file, or
+        read from a precompressed ``.gz`` sibling.
+
+        :param request (Request): The request.
+        """
+        entry = self.static_entry
+        policy = self.compression
+        if policy.allows(entry.mime_type, entry.size):
+            self.headers["Vary"] = "Accept-Encoding"
+        coding = policy.negotiate(request.get_header("accept-encoding"))
+        if coding is None:
+            return
+        variant = self.static_cache.variant(entry, coding, policy)
+        if variant is None:
+            return
+
+        body, etag = variant
+        self.headers["Content-Encoding"] = coding
+        self.headers["Vary"] = "Accept-Encoding"
+        self.headers["ETag"] = etag
+        if isinstance(body, FileBody):
+            self.stream = body
+            self._content = b""
+        else:
+            self.stream = None
+            self._content = body
+
+    def apply_range(self, request):
+        """
+        Restrict a static response to the byte ranges asked by the client.
+
+        One range is answered with ``206`` and a ``Content-Range`` header,
+        several with a ``multipart/byteranges`` body, and ranges lying past
+        the end of the file with ``416``. Streamed files stay streamed: only
+        the requested regions are sent with ``sendfile``.
+
+        :param request (Request): The request.
+        """
+        header = request.get_header("range")
+        if header is None or request.method not in ("GET", "HEAD"):
+            return
+        if not if_range_matches(request.get_header("if-range"), self.headers.get("ETag"),
+                                self.headers.get("Last-Modified")):
+            return
+
+        size = self.content_length()
+        ranges = parse_range(header, size)
+        if ranges is None:
+            return
+
+        if not ranges:
+            self.status_code = 416
+            self.reason = "Range Not Satisfiable"
+            self.headers["Content-Range"] = "bytes */{}".format(size)
+            self._content = b""
+            self.stream = None
+            return
+
+        self.status_code = 206
+        self.reason = "Partial Content"
+        if len(ranges) == 1:
+            first, last = ranges[0]
+            self.headers["Content-Range"] = content_range(first, last, size)
+            if self.stream is not None:
+                self.stream = FileBody(self.stream.path, first, last - first + 1)
+            else:
+                self._content = self._content[first:last + 1]
+            return
+
+        boundary = new_boundary()
+        content_type = self.headers.get("Content-Type", "application/octet-stream")
+        parts = []
+        for first, last in ranges:
+            parts.append(part_header(boundary, content_type, first, last, size))
+            if self.stream is not None:
+                parts.append(FileBody(self.stream.path, first, last - first + 1))
+            else:
+                parts.append(self._content[first:last + 1])
+        parts.append(closing_delimiter(boundary))
+
+        self.headers["Content-Type"] = "multipart/byteranges; boundary={}".format(boundary)
+        if self.stream is not None:
+            self.stream = CompositeBody(parts)
+        else:
+            self._content = b"".join(parts)
\ No newline at end of file
@@ -0,0 +1,338 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.router
+~~~~~~~~~~~~~~~~~
+
+This module provides a compiled routing table for WeApRous applications.
+
+Routes are stored in a trie keyed by path segment, so a lookup walks one node
+per segment of the requested path and its cost does not depend on how many
+routes are registered. Patterns may contain typed parameters and a trailing
+wildcard:
+
+- ``/peers/<id>``          -- any single segment, passed as ``str``
+- ``/peers/<int:id>``      -- a segment made of digits, passed as ``int``
+- ``/zoom/<float:level>``  -- digits with at most one ``.``, passed as ``float``
+- ``/files/<path:name>``   -- the rest of the path, ``/`` included
+- ``/static/*``            -- the rest of the path, passed as ``path``
+
+At each level static segments win over typed parameters, typed parameters
+over plain ones, and wildcards come last.
+
+Usage Example:
+--------------
+>>> router = Router()
+>>> router.add("GET", "/peers/<int:id>", get_peer)
+>>> match = router.match("GET", "/peers/42")
+>>> match.handler, match.params
+(<function get_peer>, {'id': 42})
+"""
+
+def to_int(segment):
+    """Convert a segment made of ASCII digits, without sign, spaces or ``_``."""
+    if not (segment.isascii() and segment.isdigit()):
+        raise ValueError("Not an integer segment '{}'".format(segment))
+    return int(segment)
+
+
+def to_float(segment):
+    """Convert ASCII digits with at most one ``.``, without sign, exponent or ``_``."""
+    digits = segment.replace(".", "", 1)
+    if not (digits.isascii() and digits.isdigit()):
+        raise ValueError("Not a decimal segment '{}'".format(segment))
+    return float(segment)
+
+
+#: Parameter converters: name -> (priority, convert). Lower priority is tried first.
+CONVERTERS = {
+    "int": (0, to_int),
+    "float": (1, to_float),
+    "str": (2, str),
+    "path": (3, str),
+}
+
+
+class Route:
+    """One registered ``(method, pattern)`` entry.
+
+    Attributes:
+        method (str): HTTP method.
+        pattern (str): URL pattern.
+        handler (callable): Route handler, None for public static paths.
+        public (bool): Authentication middleware is skipped for this route.
+        skip (tuple): Names of further middleware skipped for this route.
+        chain (callable): Compiled middleware chain, set at startup.
+    """
+
+    __slots__ = ("method", "pattern", "handler", "public", "skip", "chain")
+
+    def __init__(self, method, pattern, handler, public=False, skip=()):
+        self.method = method
+        self.pattern = pattern
+        self.handler = handler
+        self.public = public
+        self.skip = tuple(skip)
+        self.chain = None
+
+    def __repr__(self):
+        return "{} {}".format(self.method, self.pattern)
+
+
+class RouteMatch:
+    """The result of a :meth:`Router.match` lookup.
+
+    Attributes:
+        handler (callable): The matched handler, or None.
+        params (dict): Converted path parameters.
+        allowed (tuple): Methods registered for the path when it exists but
+                         the requested method is not one of them (405).
+        route (Route): The matched entry, or None.
+    """
+
+    __slots__ = ("handler", "params", "allowed", "route")
+
+    def __init__(self, route=None, params=None, allowed=()):
+        self.route = route
+        self.handler = route.handler if route is not None else None
+        self.params = params or {}
+        self.allowed = allowed
+
+    def __bool__(self):
+        return self.handler is not None
+
+
+#: Shared result for paths that match no route at all.
+NO_MATCH = RouteMatch()
+
+
+class _Node:
+    __slots__ = ("children", "params", "wildcard", "name", "convert", "handlers")
+
+    def __init__(self, name=None, convert=None):
+        #: static segment -> _Node
+        self.children = {}
+        #: parameter children ordered by converter priority
+        self.params = []
+        #: catch-all child, matches the remaining segments
+        self.wildcard = None
+        #: parameter name and converter of this node
+        self.name = name
+        self.convert = convert
+        #: method -> Route
+        self.handlers = {}
+
+
+def split_path(path):
+    """Split a URL path into its non-empty segments."""
+    return [seg for seg in path.split("/") if seg]
+
+
+def parse_segment(segment):
+    """
+    Parse one pattern segment.
+
+    :rtype tuple: ``("static", segment, None)``, ``("param", name, converter)``
+                  or ``("wildcard", name, None)``.
+    """
+    if segment == "*":
+        return "wildcard", "path", None
+    if segment.startswith("<") and segment.endswith(">"):
+        spec = segment[1:-1]
+        kind, sep, name = spec.partition(":")
+        if not sep:
+            kind, name = "str", spec
+        if kind not in CONVERTERS:
+            raise ValueError("Unknown route parameter type '{}'".format(kind))
+        if not name.isidentifier():
+            raise ValueError("Invalid route parameter name '{}'".format(name))
+        if kind == "path":
+            return "wildcard", name, None
+        return "param", name, kind
+    return "static", segment, None
+
+
+class Router:
+    """A trie of registered routes supporting path parameters.
+
+    The router also answers ``get((method, path))`` like the plain route
+    dictionary it replaces, so code written against the dict keeps working.
+
+    Attributes:
+        routes (dict): ``(method, pattern) -> Route`` as registered.
+        default_chain (callable): Middleware chain of unrouted paths.
+        compiled (bool): True once the middleware chains are attached.
+    """
+
+    def __init__(self):
+        self.root = _Node()
+        self.routes = {}
+        self.default_chain = None
+        self.compiled = False
+
+    @classmethod
+    def from_routes(cls, routes):
+        """
+        Build a router from a ``{(method, path): handler}`` mapping.
+
+        :param routes (dict|Router): The route mapping. A router is returned as is.
+        :rtype Router
+        """
+        if isinstance(routes, Router):
+            return routes
+        router = cls()
+        for (method, path), handler in (routes or {}).items():
+            router.add(method, path, handler,
+                       public=getattr(handler, "_route_public", False),
+                       skip=getattr(handler, "_route_skip", ()))
+        return router
+
+    def add(self, method, pattern, handler, public=False, skip=()):
+        """
+        Register ``handler`` for ``method`` requests matching ``pattern``.
+
+        :param method (str): HTTP method.
+        :param pattern (str): URL pattern, see the module documentation.
+        :param handler (callable): Route handler.
+        :param public (bool): Skip authentication middleware on this route.
+        :param skip (list): Names of further middleware skipped on this route.
+        :rtype Route: The registered entry.
+        """
+        route = Route(method.upper(), pattern, handler, public, skip)
+        self._node(pattern).handlers[route.method] = route
+        self.routes[(route.method, pattern)] = route
+        return route
+
+    def add_public(self, method, pattern):
+        """
+        Mark ``method`` requests matching ``pattern`` as public.
+
+        An existing route keeps its handler and becomes public; otherwise a
+        handler-less entry is added so that static files under the pattern
+        are resolved as public by the router.
+
+        :param method (str): HTTP method.
+        :param pattern (str): URL pattern.
+        :rtype Route: The public entry.
+        """
+        route = self._node(pattern).handlers.get(method.upper())
+        if route is None:
+            return self.add(method, pattern, None, public=True)
+        route.public = True
+        return route
+
+    def _node(self, pattern):
+        node = self.root
+        segments = split_path(pattern)
+        for i, segment in enumerate(segments):
+            kind, name, conv = parse_segment(segment)
+            if kind == "static":
+                node = node.children.setdefault(segment, _Node())
+            elif kind == "param":
+                priority, convert = CONVERTERS[conv]
+                for _, child in node.params:
+                    if child.name == name and child.convert is convert:
+                        node = child
+                        break
+                else:
+                    child = _Node(name, convert)
+                    node.params.append((priority, child))
+                    node.params.sort(key=lambda item: item[0])
+                    node = child
+            else:
+                if i != len(segments) - 1:
+                    raise ValueError("Wildcard must be the last segment of '{}'".format(pattern))
+                if node.wildcard is None:
+                    node.wildcard = _Node(name, str)
+                elif node.wildcard.name != name:
+                    raise ValueError("Conflicting wildcard names in '{}'".format(pattern))
+                node = node.wildcard
+        return node
+
+    def match(self, method, path):
+        """
+        Find the handler of ``method`` for ``path``.
+
+        :param method (str): HTTP method.
+        :param path (str): URL path, without query string.
+        :rtype RouteMatch: a falsy match when nothing is registered for the
+                           method; ``allowed`` lists the methods of the path
+                           when the path itself exists. ``HEAD`` matches the
+                           ``GET`` entry of a path without its own ``HEAD``.
+        """
+        segments = split_path(path or "")
+        params = {}
+        allowed = set()
+        route = self._walk(self.root, segments, 0, method, params, allowed)
+        if route is not None:
+            return RouteMatch(route, params)
+        if not allowed:
+            return NO_MATCH
+        if "GET" in allowed:
+            allowed.add("HEAD")
+        return RouteMatch(allowed=tuple(sorted(allowed)))
+
+    def get(self, key, default=None):
+        """Dict compatible lookup by ``(method, path)``."""
+        method, path = key
+        return self.match(method, path).handler or default
+
+    def _walk(self, node, segments, i, method, params, allowed):
+        # Backtracks until a branch matches both the path and the method; the
+        # methods of branches that only match the path are gathered for a 405
+        if i == len(segments):
+            return self._leaf(node, method, allowed)
+
+        segment = segments[i]
+        child = node.children.get(segment)
+        if child is not None:
+            found = self._walk(child, segments, i + 1, method, params, allowed)
+            if found is not None:
+                return found
+
+        for _, child in node.params:
+            try:
+                value = child.convert(segment)
+            except ValueError:
+                continue
+            found = self._walk(child, segments, i + 1, method, params, allowed)
+            if found is not None:
+                params[child.name] = value
+                return found
+
+        if node.wildcard is not None:
+            found = self._leaf(node.wildcard, method, allowed)
+            if found is not None:
+                params[node.wildcard.name] = "/".join(segments[i:])
+                return found
+
+        return None
+
+    @staticmethod
+    def _leaf(node, method, allowed):
+        route = node.handlers.get(method)
+        if route is None and method == "HEAD":
+            # HEAD is GET without the body: it shares the GET route, handler and public flag
+            route = node.handlers.get("GET")
+        if route is None:
+            allowed.update(m for m, r in node.handlers.items() if r.handler is not None)
+        return route
+
+    def __len__(self):
+        return len(self.routes)
+
+    def __iter__(self):
+        return iter(self.routes)
+
+    def __repr__(self):
+        return "<Router {}>".format(", ".join(repr(r) for r in self.routes.values()))
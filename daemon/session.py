@@ -0,0 +1,248 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.session
+~~~~~~~~~~~~~~~~~
+
+This module provides the session stores behind the ``sessionid`` cookie.
+
+Sessions expire after ``ttl`` seconds without use and the number of live
+sessions is capped, the least recently used ones being dropped first, so
+anonymous traffic cannot grow the store without bound.
+
+Two backends share the same interface:
+
+- :class:`MemorySessionStore` keeps sessions in the process, split into
+  shards that each have their own lock, so concurrent requests rarely wait
+  on each other;
+- :class:`SQLiteSessionStore` keeps them in a SQLite file, so the pre-forked
+  workers of a backend (``--workers``) see the same sessions without sticky
+  routing.
+
+Usage Example:
+--------------
+>>> store = SQLiteSessionStore("sessions.db")
+>>> sid = store.create("admin")
+>>> store.get(sid)["user"]
+'admin'
+"""
+
+import abc
+import itertools
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+#: Seconds a session stays valid after its last use.
+SESSION_TTL = 30 * 60
+
+#: Largest number of live sessions.
+MAX_SESSIONS = 100000
+
+#: Number of independently locked shards of the in-memory store.
+SHARDS = 16
+
+
+class SessionStore(abc.ABC):
+    """Interface of the session backends.
+
+    Attributes:
+        ttl (float): Seconds a session stays valid after its last use.
+        max_sessions (int): Largest number of live sessions.
+    """
+
+    def __init__(self, ttl=SESSION_TTL, max_sessions=MAX_SESSIONS):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+
+    @abc.abstractmethod
+    def create(self, user="guest"):
+        """
+        Open a new session.
+
+        :param user (str): The session owner.
+        :rtype str: The new session id.
+        """
+
+    @abc.abstractmethod
+    def get(self, sid):
+        """
+        Return the data of a live session and extend its lifetime.
+
+        :param sid (str): The session id.
+        :rtype dict: ``{"user": ..., "created_at": ...}``, or None when the
+                     session is unknown or expired.
+        """
+
+    @abc.abstractmethod
+    def delete(self, sid):
+        """Close a session."""
+
+    def __contains__(self, sid):
+        return self.get(sid) is not None
+
+
+class MemorySessionStore(SessionStore):
+    """Sessions held in the process, in sharded LRU maps with TTL expiry."""
+
+    def __init__(self, ttl=SESSION_TTL, max_sessions=MAX_SESSIONS, shards=SHARDS):
+        """
+        Initialize a new MemorySessionStore instance.
+
+        :param ttl (float): Seconds a session stays valid after its last use.
+        :param max_sessions (int): Largest number of live sessions.
+        :param shards (int): Number of independently locked shards.
+        """
+        super().__init__(ttl, max_sessions)
+        self._shards = [OrderedDict() for _ in range(shards)]
+        self._locks = [threading.Lock() for _ in range(shards)]
+        self._shard_size = max(1, max_sessions // shards)
+
+    def _shard(self, sid):
+        i = hash(sid) % len(self._shards)
+        return self._shards[i], self._locks[i]
+
+    def create(self, user="guest"):
+        sid = str(uuid.uuid4())
+        now = time.time()
+        sessions, lock = self._shard(sid)
+        with lock:
+            # Least recently used first: expired sessions sit at the front
+            while sessions:
+                oldest = next(iter(sessions.values()))
+                if oldest["expires"] > now and len(sessions) < self._shard_size:
+                    break
+                sessions.popitem(last=False)
+            sessions[sid] = {"user": user, "created_at": now, "expires": now + self.ttl}
+        return sid
+
+    def get(self, sid):
+        now = time.time()
+        sessions, lock = self._shard(sid)
+        with lock:
+            data = sessions.get(sid)
+            if data is None:
+                return None
+            if data["expires"] <= now:
+                del sessions[sid]
+                return None
+            data["expires"] = now + self.ttl
+            sessions.move_to_end(sid)
+            return data
+
+    def delete(self, sid):
+        sessions, lock = self._shard(sid)
+        with lock:
+            sessions.pop(sid, None)
+
+    def __len__(self):
+        return sum(len(sessions) for sessions in self._shards)
+
+    def __repr__(self):
+        return "<MemorySessionStore {} sessions, ttl={}>".format(len(self), self.ttl)
+
+
+class SQLiteSessionStore(SessionStore):
+    """Sessions held in a SQLite file shared by the worker processes.
+
+    Each thread of each process opens its own connection. The database runs
+    in WAL mode so readers do not block the writer. Expiry is refreshed at
+    most once per ``ttl / 2`` for a session, to keep reads from writing.
+    """
+
+    #: Sessions created between two purges of expired and excess rows.
+    PURGE_INTERVAL = 256
+
+    def __init__(self, path, ttl=SESSION_TTL, max_sessions=MAX_SESSIONS):
+        """
+        Initialize a new SQLiteSessionStore instance.
+
+        :param path (str): Path of the database file.
+        :param ttl (float): Seconds a session stays valid after its last use.
+        :param max_sessions (int): Largest number of live sessions.
+        """
+        super().__init__(ttl, max_sessions)
+        self.path = path
+        self._local = threading.local()
+        # next() on a count is atomic, unlike += on an attribute shared by threads
+        self._created = itertools.count(1)
+        # Schema and WAL mode are stored in the file: set them up once
+        conn = sqlite3.connect(path, timeout=5.0, isolation_level=None)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "sid TEXT PRIMARY KEY, user TEXT, created REAL, expires REAL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_expires ON sessions (expires)")
+        finally:
+            conn.close()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        # A forked worker must not reuse the connection of its parent
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            # Per connection setting, not kept in the file
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def create(self, user="guest"):
+        sid = str(uuid.uuid4())
+        now = time.time()
+        conn = self._conn()
+        conn.execute("INSERT INTO sessions VALUES (?, ?, ?, ?)", (sid, user, now, now + self.ttl))
+        if next(self._created) % self.PURGE_INTERVAL == 0:
+            self.purge(now)
+        return sid
+
+    def get(self, sid):
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute("SELECT user, created, expires FROM sessions WHERE sid = ?",
+                           (sid,)).fetchone()
+        if row is None:
+            return None
+        user, created, expires = row
+        if expires <= now:
+            conn.execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+            return None
+        if expires - now < self.ttl / 2:
+            conn.execute("UPDATE sessions SET expires = ? WHERE sid = ?", (now + self.ttl, sid))
+        return {"user": user, "created_at": created, "expires": expires}
+
+    def delete(self, sid):
+        self._conn().execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+
+    def purge(self, now=None):
+        """Delete expired sessions, then the least recently used ones over the cap."""
+        now = time.time() if now is None else now
+        conn = self._conn()
+        conn.execute("DELETE FROM sessions WHERE expires <= ?", (now,))
+        conn.execute(
+            "DELETE FROM sessions WHERE sid IN (SELECT sid FROM sessions "
+            "ORDER BY expires DESC LIMIT -1 OFFSET ?)", (self.max_sessions,))
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def __repr__(self):
+        return "<SQLiteSessionStore {} ttl={}>".format(self.path, self.ttl)
+
+
+#: Default session store of the responses of this process.
+SESSION_STORE = MemorySessionStore()
@@ -0,0 +1,284 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.staticcache
+~~~~~~~~~~~~~~~~~
+
+This module provides an in-memory cache of static files (``www/``, ``static/``)
+shared by every connection of a backend process.
+
+Entries are keyed by the resolved file path and hold the file content together
+with its MIME type and prebuilt headers. Files larger than ``max_entry_size``
+are only described by their entry (size, mtime, headers) and are streamed from
+disk by the response. The cache is bounded by a byte budget and evicts the
+least recently used entries first. An entry is revalidated with a single
+``stat`` at most once every ``revalidate_interval`` seconds and reloaded when
+the file size or modification time changed, so repeat hits on a hot asset do
+not touch the filesystem at all.
+
+Compressed variants of an entry (see :mod:`daemon.compression`) are built on
+first use, or taken from a precompressed ``.gz`` sibling of the file, and are
+kept with the entry, so each asset is compressed once.
+
+Usage Example:
+--------------
+>>> entry = STATIC_CACHE.get("www/index.html", "text/html")
+>>> entry.content, entry.headers["Content-Length"]
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from .httpcache import make_etag, http_date
+from .compression import compress
+from .streaming import FileBody
+
+#: Default byte budget of the cache.
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+#: Files larger than this are not loaded in memory but streamed from disk.
+MAX_ENTRY_SIZE = 4 * 1024 * 1024
+
+#: Budget charged for an entry that holds no content.
+ENTRY_OVERHEAD = 256
+
+#: Seconds a cached entry is trusted before its file is stat'ed again.
+REVALIDATE_INTERVAL = 1.0
+
+
+class CacheEntry:
+    """A cached static file.
+
+    Attributes:
+        path (str): Resolved file path.
+        content (bytes): File content, None when the file is streamed from disk.
+        size (int): File size in bytes.
+        mtime (int): Modification time of the file, in nanoseconds.
+        mime_type (str): MIME type served for the file.
+        etag (str): Strong entity tag of the file.
+        headers (dict): Prebuilt ``Content-Type``, ``Content-Length``, ``ETag``,
+                        ``Last-Modified`` and ``Accept-Ranges`` headers.
+        checked (float): Monotonic time of the last revalidation.
+        variants (dict): ``coding -> (body, etag)`` of the compressed variants,
+                         ``None`` when a coding is not worth it. The body is
+                         bytes, or a :class:`FileBody` for a large ``.gz`` sibling.
+    """
+
+    __slots__ = ("path", "content", "size", "mtime", "mime_type", "etag", "headers", "checked",
+                 "variants")
+
+    def __init__(self, path, content, size, mtime, mime_type, checked):
+        self.path = path
+        self.content = content
+        self.size = size
+        self.mtime = mtime
+        self.mime_type = mime_type
+        self.etag = make_etag(size, mtime)
+        self.headers = {
+            "Content-Type": mime_type,
+            "Content-Length": str(self.size),
+            "ETag": self.etag,
+            "Last-Modified": http_date(mtime // 1000000000),
+            "Accept-Ranges": "bytes",
+        }
+        self.checked = checked
+        self.variants = {}
+
+    @property
+    def cost(self):
+        """Bytes charged to the cache budget for this entry."""
+        cost = len(self.content) if self.content is not None else ENTRY_OVERHEAD
+        for variant in self.variants.values():
+            if variant is not None and isinstance(variant[0], bytes):
+                cost += len(variant[0])
+        return cost
+
+
+class StaticCache:
+    """A thread-safe LRU cache of static files bounded by a byte budget.
+
+    Attributes:
+        max_bytes (int): Byte budget of the cached contents.
+        max_entry_size (int): Largest file whose content is kept in memory.
+        revalidate_interval (float): Seconds between two ``stat`` of an entry.
+        size (int): Bytes currently cached.
+        hits (int): Lookups served from memory.
+        misses (int): Lookups that read the file.
+    """
+
+    def __init__(self, max_bytes=MAX_CACHE_BYTES, max_entry_size=MAX_ENTRY_SIZE,
+                 revalidate_interval=REVALIDATE_INTERVAL):
+        """
+        Initialize a new StaticCache instance.
+
+        :param max_bytes (int): Byte budget of the cached contents, 0 disables caching.
+        :param max_entry_size (int): Largest file whose content is kept in memory.
+        :param revalidate_interval (float): Seconds between two ``stat`` of an entry.
+        """
+        self.max_bytes = max_bytes
+        self.max_entry_size = max_entry_size
+        self.revalidate_interval = revalidate_interval
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def configure(self, max_bytes=None, max_entry_size=None, revalidate_interval=None):
+        """Change the cache limits, evicting entries that no longer fit."""
+        with self._lock:
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            if max_entry_size is not None:
+                self.max_entry_size = max_entry_size
+            if revalidate_interval is not None:
+                self.revalidate_interval = revalidate_interval
+            self._evict()
+
+    def get(self, path, mime_type):
+        """
+        Return the entry of ``path``, loading or reloading the file when needed.
+
+        :param path (str): Resolved file path.
+        :param mime_type (str): MIME type to serve the file with.
+        :raise OSError: the file cannot be read (``FileNotFoundError`` included).
+        :rtype CacheEntry
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None:
+                self._entries.move_to_end(path)
+                if now - entry.checked < self.revalidate_interval and entry.mime_type == mime_type:
+                    self.hits += 1
+                    return entry
+
+        if entry is not None and entry.mime_type == mime_type:
+            try:
+                st = os.stat(path)
+            except OSError:
+                self.discard(path)
+                raise
+            if st.st_mtime_ns == entry.mtime and st.st_size == entry.size:
+                entry.checked = now
+                with self._lock:
+                    self.hits += 1
+                return entry
+
+        return self._load(path, mime_type, now)
+
+    def variant(self, entry, coding, policy):
+        """
+        Return the ``coding`` variant of ``entry``, building it on first use.
+
+        A gzip variant comes from a ``.gz`` sibling of the file when one exists
+        and is not older than the file, otherwise the content is compressed
+        if ``policy`` allows it. A variant that does not shrink the content
+        is not used.
+
+        :param entry (CacheEntry): The entry, as returned by :meth:`get`.
+        :param coding (str): ``gzip`` or ``deflate``.
+        :param policy (CompressionPolicy): The compression policy.
+        :rtype tuple: ``(body, etag)``, or None to send the entry as it is.
+        """
+        with self._lock:
+            if coding in entry.variants:
+                return entry.variants[coding]
+
+        variant = None
+        if coding == "gzip" and policy.precompressed:
+            variant = self._precompressed(entry)
+        if variant is None and entry.content is not None and policy.allows(entry.mime_type, entry.size):
+            data = compress(entry.content, coding, policy.level)
+            if len(data) < entry.size:
+                variant = (data, variant_etag(entry.etag, coding))
+
+        with self._lock:
+            if coding not in entry.variants:
+                entry.variants[coding] = variant
+                if self._entries.get(entry.path) is entry and variant is not None \
+                        and isinstance(variant[0], bytes):
+                    self.size += len(variant[0])
+                    self._evict()
+            return entry.variants[coding]
+
+    def _precompressed(self, entry):
+        gz_path = entry.path + ".gz"
+        try:
+            st = os.stat(gz_path)
+        except OSError:
+            return None
+        if st.st_mtime_ns < entry.mtime:
+            # Left over from an older version of the file
+            return None
+        etag = variant_etag(entry.etag, "gzip")
+        if st.st_size > self.max_entry_size:
+            return FileBody(gz_path, 0, st.st_size), etag
+        try:
+            with open(gz_path, "rb") as f:
+                return f.read(), etag
+        except OSError:
+            return None
+
+    def discard(self, path):
+        """Drop the entry of ``path``, if cached."""
+        with self._lock:
+            entry = self._entries.pop(path, None)
+            if entry is not None:
+                self.size -= entry.cost
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def _load(self, path, mime_type, now):
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            content = f.read() if st.st_size <= self.max_entry_size else None
+        entry = CacheEntry(path, content, st.st_size, st.st_mtime_ns, mime_type, now)
+
+        with self._lock:
+            self.misses += 1
+            old = self._entries.pop(path, None)
+            if old is not None:
+                self.size -= old.cost
+            if entry.cost <= self.max_bytes:
+                self._entries[path] = entry
+                self.size += entry.cost
+                self._evict()
+        return entry
+
+    def _evict(self):
+        while self.size > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self.size -= entry.cost
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return "<StaticCache {} entries, {}/{} bytes, {} hits, {} misses>".format(
+            len(self._entries), self.size, self.max_bytes, self.hits, self.misses)
+
+
+def variant_etag(etag, coding):
+    """Return the entity tag of the ``coding`` variant of a representation."""
+    return '{}-{}"'.format(etag[:-1], coding)
+
+
+#: Cache shared by the responses of this process.
+STATIC_CACHE = StaticCache()
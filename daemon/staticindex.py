@@ -0,0 +1,199 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.staticindex
+~~~~~~~~~~~~~~~~~
+
+This module provides the index of the static files served by the backend.
+
+The asset directories (``www/``, ``static/``, ``videos/``, ``audios/``) are
+scanned once at startup and every servable file is recorded under the URL
+path that requests it, with its absolute path, size, modification time and
+MIME type. The URL to directory mapping is the one of
+:meth:`Response.prepare_content_type`: HTML pages live in ``www/``, CSS and
+images in ``static/``, video and audio in ``videos/`` and ``audios/``.
+
+Serving a static request is then a single dictionary lookup, and a path that
+is not in the index is answered with 404 without touching the filesystem.
+Files added or removed later are picked up by an optional polling watcher.
+
+Usage Example:
+--------------
+>>> STATIC_INDEX.scan()
+>>> STATIC_INDEX.lookup("/css/styles.css").path
+'/srv/app/static/css/styles.css'
+"""
+
+import mimetypes
+import os
+import threading
+import time
+
+#: Asset directories scanned by default.
+ASSET_DIRS = ("www/", "static/", "videos/", "audios/")
+
+#: MIME main types served from a directory other than the one of their subtype.
+MAIN_TYPE_DIRS = {
+    "image": "static/",
+    "video": "videos/",
+    "audio": "audios/",
+}
+
+#: ``text/*`` subtypes served as static files.
+TEXT_TYPE_DIRS = {
+    "html": "www/",
+    "css": "static/",
+}
+
+
+def guess_mime_type(url):
+    """Return the MIME type of a URL path, as the response would label it."""
+    if url.endswith(".html"):
+        return "text/html"
+    mime_type, _ = mimetypes.guess_type(url)
+    return mime_type or "application/octet-stream"
+
+
+def asset_dir(mime_type):
+    """
+    Return the directory serving files of ``mime_type``.
+
+    :rtype str: One of :data:`ASSET_DIRS`, or None for types served elsewhere.
+    """
+    main_type, _, sub_type = mime_type.partition("/")
+    if main_type == "text":
+        return TEXT_TYPE_DIRS.get(sub_type)
+    return MAIN_TYPE_DIRS.get(main_type)
+
+
+class StaticAsset:
+    """One indexed static file.
+
+    Attributes:
+        url (str): URL path requesting the file.
+        path (str): Absolute file path.
+        size (int): File size at the last scan.
+        mtime (int): Modification time at the last scan, in nanoseconds.
+        mime_type (str): ``Content-Type`` of the file.
+        headers (dict): Base response headers of the file.
+    """
+
+    __slots__ = ("url", "path", "size", "mtime", "mime_type", "headers")
+
+    def __init__(self, url, path, size, mtime, mime_type):
+        self.url = url
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+        self.mime_type = mime_type
+        self.headers = {"Content-Type": mime_type}
+
+    def __repr__(self):
+        return "<StaticAsset {} -> {}>".format(self.url, self.path)
+
+
+class StaticIndex:
+    """URL path to :class:`StaticAsset` index of the asset directories.
+
+    Attributes:
+        base_dir (str): Directory holding the asset directories.
+        dirs (tuple): Asset directories, relative to ``base_dir``.
+        watch_interval (float): Seconds between two rescans by the watcher,
+                                0 to never rescan.
+        ready (bool): True once a scan has completed.
+    """
+
+    def __init__(self, base_dir="", dirs=ASSET_DIRS, watch_interval=0):
+        self.base_dir = base_dir
+        self.dirs = tuple(dirs)
+        self.watch_interval = watch_interval
+        self.ready = False
+        self._assets = {}
+        self._watcher = None
+        self._pid = None
+
+    def scan(self):
+        """
+        Rebuild the index from the asset directories.
+
+        The new index replaces the old one in a single assignment, so
+        concurrent lookups see either of them, never a partial index.
+
+        :rtype int: Number of indexed files.
+        """
+        assets = {}
+        for directory in self.dirs:
+            root = os.path.abspath(os.path.join(self.base_dir, directory))
+            for dirpath, _, filenames in os.walk(root):
+                for filename in filenames:
+                    path = os.path.join(dirpath, filename)
+                    url = "/" + os.path.relpath(path, root).replace(os.sep, "/")
+                    mime_type = guess_mime_type(url)
+                    # Only files that a request for ``url`` resolves to
+                    if asset_dir(mime_type) != directory:
+                        continue
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    assets[url] = StaticAsset(url, path, st.st_size, st.st_mtime_ns, mime_type)
+        self._assets = assets
+        self.ready = True
+        return len(assets)
+
+    def lookup(self, url):
+        """
+        Return the asset of a URL path.
+
+        :rtype StaticAsset: The asset, or None when the path is not indexed.
+        """
+        return self._assets.get(url)
+
+    def covers(self, url):
+        """Return True when ``url`` would be served from an indexed directory."""
+        return asset_dir(guess_mime_type(url)) in self.dirs
+
+    def start_watcher(self):
+        """
+        Start the polling watcher of this process, if ``watch_interval`` is set.
+
+        Each pre-forked worker runs its own watcher; a thread of the parent
+        does not survive the fork.
+        """
+        if not self.watch_interval or self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._watcher = threading.Thread(target=self._watch, name="static-index")
+        self._watcher.daemon = True
+        self._watcher.start()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.watch_interval)
+            try:
+                self.scan()
+            except OSError as e:
+                print("[StaticIndex] Rescan failed: {}".format(e))
+
+    def __len__(self):
+        return len(self._assets)
+
+    def __iter__(self):
+        return iter(self._assets)
+
+    def __repr__(self):
+        return "<StaticIndex {} assets in {}>".format(len(self._assets), ", ".join(self.dirs))
+
+
+#: Static index of this process.
+STATIC_INDEX = StaticIndex()
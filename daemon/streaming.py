@@ -0,0 +1,250 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.streaming
+~~~~~~~~~~~~~~~~~
+
+This module provides response bodies that are written to the client after the
+header instead of being built in memory.
+
+:class:`FileBody` sends a region of a file with ``sendfile(2)``: the kernel
+copies the pages straight from the page cache to the socket, so the memory used
+by a download does not depend on the size of the file. :class:`CompositeBody`
+chains in-memory parts and file regions. :class:`ChunkedBody` sends the output
+of a generator or async iterator route handler as it is produced.
+
+Usage Example:
+--------------
+>>> conn.sendall(header)
+>>> FileBody("static/images/welcome.jpg", 0, size).send(conn)
+"""
+
+import asyncio
+
+from .eventloop import run_coroutine
+from .httpheaders import CRLF
+
+#: Terminating chunk of a chunked body, without trailers.
+LAST_CHUNK = b"0\r\n\r\n"
+
+
+class FileBody:
+    """A file region sent as a response body.
+
+    Attributes:
+        path (str): Path of the file.
+        offset (int): First byte to send.
+        count (int): Number of bytes to send.
+    """
+
+    __slots__ = ("path", "offset", "count")
+
+    def __init__(self, path, offset, count):
+        self.path = path
+        self.offset = offset
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def send(self, conn):
+        """
+        Send the region on a blocking socket.
+
+        ``socket.sendfile`` uses ``os.sendfile`` when available and falls back
+        to a bounded ``send`` loop otherwise.
+
+        :param conn (socket): The client socket.
+        """
+        if not self.count:
+            return
+        with open(self.path, "rb") as f:
+            sent = conn.sendfile(f, self.offset, self.count)
+        if sent < self.count:
+            # The file shrank: the announced Content-Length cannot be honoured
+            raise ConnectionError("short sendfile on {}".format(self.path))
+
+    async def send_async(self, writer):
+        """
+        Send the region on an asyncio stream.
+
+        :param writer (asyncio.StreamWriter): The client write stream.
+        """
+        await writer.drain()
+        if not self.count:
+            return
+        loop = asyncio.get_running_loop()
+        with open(self.path, "rb") as f:
+            sent = await loop.sendfile(writer.transport, f, self.offset, self.count)
+        if sent < self.count:
+            raise ConnectionError("short sendfile on {}".format(self.path))
+
+    def __repr__(self):
+        return "<FileBody {} [{}:{}]>".format(self.path, self.offset, self.offset + self.count)
+
+
+class CompositeBody:
+    """A body made of in-memory parts and file regions, sent in order.
+
+    Used for ``multipart/byteranges`` responses over streamed files.
+
+    Attributes:
+        parts (list): ``bytes`` and :class:`FileBody` items.
+    """
+
+    __slots__ = ("parts",)
+
+    def __init__(self, parts):
+        self.parts = parts
+
+    def __len__(self):
+        return sum(len(part) for part in self.parts)
+
+    def send(self, conn):
+        """Send every part on a blocking socket."""
+        for part in self.parts:
+            if isinstance(part, FileBody):
+                part.send(conn)
+            else:
+                conn.sendall(part)
+
+    async def send_async(self, writer):
+        """Send every part on an asyncio stream."""
+        for part in self.parts:
+            if isinstance(part, FileBody):
+                await part.send_async(writer)
+            else:
+                writer.write(part)
+        await writer.drain()
+
+
+class ChunkedBody:
+    """A body produced by a route handler while it is being sent.
+
+    The handler returns a generator, an iterator or an async iterator of
+    ``bytes`` or ``str`` chunks. Each chunk is written as soon as it is
+    produced, with ``Transfer-Encoding: chunked`` framing for HTTP/1.1
+    clients; older clients get the raw bytes and the connection is closed to
+    mark the end of the body. The next chunk is only requested once the
+    previous one has been handed to the socket, so a slow client slows the
+    producer down instead of filling memory.
+
+    Attributes:
+        iterable: The handler output.
+        chunked (bool): Use the chunked transfer coding.
+    """
+
+    __slots__ = ("iterable", "chunked")
+
+    def __init__(self, iterable, chunked=True):
+        self.iterable = iterable
+        self.chunked = chunked
+
+    def frame(self, chunk):
+        """Encode one chunk for the wire, None to skip an empty chunk."""
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        if not chunk:
+            return None
+        if not self.chunked:
+            return chunk
+        return b"".join((b"%x\r\n" % len(chunk), chunk, CRLF))
+
+    def send(self, conn):
+        """
+        Produce and send every chunk on a blocking socket.
+
+        Async iterators are advanced on the shared event loop.
+
+        :param conn (socket): The client socket.
+        """
+        try:
+            if hasattr(self.iterable, "__aiter__"):
+                iterator = self.iterable.__aiter__()
+                while True:
+                    try:
+                        chunk = run_coroutine(iterator.__anext__())
+                    except StopAsyncIteration:
+                        break
+                    data = self.frame(chunk)
+                    if data:
+                        conn.sendall(data)
+            else:
+                for chunk in self.iterable:
+                    data = self.frame(chunk)
+                    if data:
+                        conn.sendall(data)
+        except (OSError, ConnectionError):
+            self.close()
+            raise
+        except Exception as e:
+            # Too late for an error status: cut the body short
+            self.close()
+            raise ConnectionError("stream handler failed: {}".format(e))
+        if self.chunked:
+            conn.sendall(LAST_CHUNK)
+
+    async def send_async(self, writer):
+        """
+        Produce and send every chunk on an asyncio stream, waiting for the
+        write buffer to drain after each one.
+
+        :param writer (asyncio.StreamWriter): The client write stream.
+        """
+        try:
+            if hasattr(self.iterable, "__aiter__"):
+                async for chunk in self.iterable:
+                    data = self.frame(chunk)
+                    if data:
+                        writer.write(data)
+                        await writer.drain()
+            else:
+                for chunk in self.iterable:
+                    data = self.frame(chunk)
+                    if data:
+                        writer.write(data)
+                        await writer.drain()
+        except (OSError, ConnectionError):
+            await self.aclose()
+            raise
+        except Exception as e:
+            await self.aclose()
+            raise ConnectionError("stream handler failed: {}".format(e))
+        if self.chunked:
+            writer.write(LAST_CHUNK)
+        await writer.drain()
+
+    def close(self):
+        """Release the producer (runs its ``finally`` blocks)."""
+        close = getattr(self.iterable, "close", None)
+        if close is not None:
+            close()
+        elif hasattr(self.iterable, "aclose"):
+            run_coroutine(self.iterable.aclose())
+
+    async def aclose(self):
+        """Coroutine version of :meth:`close` for the event-loop engine."""
+        if hasattr(self.iterable, "aclose"):
+            await self.iterable.aclose()
+        else:
+            self.close()
+
+    def __repr__(self):
+        return "<ChunkedBody {}>".format("chunked" if self.chunked else "close-delimited")
+
+
+def is_streamable(value):
+    """Return True for handler results to send as a :class:`ChunkedBody`."""
+    if isinstance(value, (str, bytes, bytearray, dict, tuple, list)):
+        return False
+    return hasattr(value, "__next__") or hasattr(value, "__aiter__")
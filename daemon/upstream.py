@@ -0,0 +1,397 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.upstream
+~~~~~~~~~~~~~~~~~
+
+This module provides the persistent connections of the proxy to its backends.
+
+Connections are kept alive between requests in a pool per upstream
+``(host, port)``. The pool bounds the number of idle connections kept and of
+connections open to one upstream, drops connections that stayed idle too
+long, and checks that an idle socket is still usable before handing it out,
+since the backend may have closed it in the meantime.
+
+Since the connection outlives the response, the end of a response is found
+from its framing (``Content-Length`` or ``Transfer-Encoding: chunked``)
+rather than from the backend closing the socket.
+
+Usage Example:
+--------------
+>>> conn = UPSTREAM_POOL.acquire("127.0.0.1", 9000)
+>>> conn.sock.sendall(request)
+>>> head = conn.read_head()
+>>> body = b"".join(conn.iter_body(head, b"GET"))
+>>> UPSTREAM_POOL.release(conn, conn.reusable)
+"""
+
+import socket
+import threading
+import time
+from collections import deque
+
+from .httpreader import HEADER_END, header_value
+
+#: Largest number of idle connections kept per upstream.
+MAX_IDLE = 16
+
+#: Largest number of connections open to one upstream, idle or in use.
+MAX_PER_HOST = 64
+
+#: Seconds an idle connection is kept before it is closed. Kept below the
+#: keep-alive timeout of the backend so the backend does not close first.
+IDLE_TIMEOUT = 4.0
+
+#: Seconds allowed to establish a connection to an upstream.
+CONNECT_TIMEOUT = 5.0
+
+#: Seconds allowed between two reads of an upstream response.
+READ_TIMEOUT = 60.0
+
+#: Size of a single ``recv`` from an upstream.
+RECV_SIZE = 64 * 1024
+
+#: Largest accepted status line plus header block of an upstream response.
+MAX_HEAD_SIZE = 64 * 1024
+
+
+class UpstreamError(Exception):
+    """An upstream could not be reached or sent a malformed response."""
+
+
+def status_code(head):
+    """
+    Return the status code of a raw response header block.
+
+    :raise UpstreamError: the status line is malformed.
+    :rtype int
+    """
+    parts = head.split(b"\r\n", 1)[0].split(None, 2)
+    if len(parts) < 2 or not parts[0].startswith(b"HTTP/"):
+        raise UpstreamError("Malformed status line {!r}".format(head[:64]))
+    try:
+        return int(parts[1])
+    except ValueError:
+        raise UpstreamError("Malformed status line {!r}".format(head[:64]))
+
+
+def has_body(head, method):
+    """Return True when a response to ``method`` with this header block carries a body."""
+    code = status_code(head)
+    return method != b"HEAD" and code >= 200 and code not in (204, 304)
+
+
+class UpstreamConnection:
+    """One pooled connection to an upstream.
+
+    Attributes:
+        host (str): Upstream host.
+        port (int): Upstream port.
+        sock (socket): The connected socket.
+        reusable (bool): The last response was fully read, was not a
+                         ``101 Switching Protocols``, and the upstream keeps
+                         the connection open.
+        requests (int): Requests sent over this connection.
+        last_used (float): Monotonic time the connection was last released.
+    """
+
+    __slots__ = ("host", "port", "sock", "reusable", "requests", "last_used", "_buffer")
+
+    def __init__(self, host, port, sock):
+        self.host = host
+        self.port = port
+        self.sock = sock
+        self.reusable = False
+        self.requests = 0
+        self.last_used = time.monotonic()
+        self._buffer = bytearray()
+
+    @property
+    def key(self):
+        return (self.host, self.port)
+
+    def alive(self):
+        """
+        Return True when an idle connection can carry a new request.
+
+        An idle socket has nothing to read; if it is readable the upstream
+        closed it (or sent bytes nobody asked for), and it must be dropped.
+        The check peeks without blocking rather than using ``select``, which
+        cannot watch descriptors above ``FD_SETSIZE``.
+        """
+        if self._buffer:
+            return False
+        timeout = self.sock.gettimeout()
+        try:
+            self.sock.setblocking(False)
+            self.sock.recv(1, socket.MSG_PEEK)
+        except BlockingIOError:
+            return True
+        except OSError:
+            return False
+        finally:
+            try:
+                self.sock.settimeout(timeout)
+            except OSError:
+                pass
+        return False
+
+    def _fill(self):
+        chunk = self.sock.recv(RECV_SIZE)
+        self._buffer += chunk
+        return len(chunk)
+
+    def _take(self, size):
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    def _readline(self):
+        while True:
+            idx = self._buffer.find(b"\r\n")
+            if idx >= 0:
+                return self._take(idx + 2)
+            if len(self._buffer) > MAX_HEAD_SIZE:
+                raise UpstreamError("Chunk header too long")
+            if not self._fill():
+                raise UpstreamError("Upstream closed the connection mid-response")
+
+    def read_head(self):
+        """
+        Read the status line and headers of the next final response.
+
+        Interim ``1xx`` responses are skipped.
+
+        :raise UpstreamError: the upstream closed the connection or the
+                              header block is too large.
+        :rtype bytes: The header block, terminator included.
+        """
+        self.reusable = False
+        while True:
+            while True:
+                idx = self._buffer.find(HEADER_END)
+                if idx >= 0:
+                    break
+                if len(self._buffer) > MAX_HEAD_SIZE:
+                    raise UpstreamError("Upstream response header too large")
+                if not self._fill():
+                    raise UpstreamError("Upstream closed the connection")
+            head = self._take(idx + len(HEADER_END))
+            code = status_code(head)
+            if code >= 200 or code == 101:
+                return head
+
+    def iter_body(self, head, method):
+        """
+        Yield the body of the response of ``head`` as it arrives.
+
+        The body is relayed as sent: chunked bodies keep their framing. Once
+        the body is exhausted, :attr:`reusable` tells whether the connection
+        can carry another request.
+
+        :param head (bytes): The header block returned by :meth:`read_head`.
+        :param method (bytes): Method of the request, to recognize ``HEAD``.
+        """
+        # After a 101 the socket no longer speaks HTTP: never pool it
+        persistent = keeps_alive(head) and status_code(head) != 101
+        if not has_body(head, method):
+            self.reusable = persistent
+            return
+
+        coding = header_value(head, b"transfer-encoding")
+        length = header_value(head, b"content-length")
+        if coding is not None and coding.lower() != b"identity":
+            if not coding.lower().endswith(b"chunked"):
+                # Not framed: delimited by the upstream closing the socket
+                yield from self._until_close()
+                return
+            yield from self._chunked()
+        elif length is not None:
+            try:
+                remaining = int(length)
+            except ValueError:
+                raise UpstreamError("Invalid Content-Length {!r}".format(length))
+            while remaining > 0:
+                if not self._buffer and not self._fill():
+                    raise UpstreamError("Upstream closed the connection mid-body")
+                data = self._take(min(remaining, len(self._buffer)))
+                remaining -= len(data)
+                yield data
+        else:
+            yield from self._until_close()
+            return
+        self.reusable = persistent
+
+    def _chunked(self):
+        while True:
+            line = self._readline()
+            try:
+                size = int(line.split(b";", 1)[0].strip(), 16)
+            except ValueError:
+                raise UpstreamError("Invalid chunk size {!r}".format(line))
+            yield line
+            if size == 0:
+                break
+            remaining = size + 2
+            while remaining > 0:
+                if not self._buffer and not self._fill():
+                    raise UpstreamError("Upstream closed the connection mid-chunk")
+                data = self._take(min(remaining, len(self._buffer)))
+                remaining -= len(data)
+                yield data
+        # Trailer section, ended by an empty line
+        while True:
+            line = self._readline()
+            yield line
+            if line == b"\r\n":
+                return
+
+    def _until_close(self):
+        if self._buffer:
+            yield self._take(len(self._buffer))
+        while True:
+            chunk = self.sock.recv(RECV_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+    def __repr__(self):
+        return "<UpstreamConnection {}:{} requests={}>".format(self.host, self.port, self.requests)
+
+
+def keeps_alive(head):
+    """Return True when the upstream keeps the connection open after this response."""
+    connection = header_value(head, b"connection")
+    tokens = connection.lower() if connection else b""
+    if head.startswith(b"HTTP/1.0"):
+        return b"keep-alive" in tokens
+    return b"close" not in tokens
+
+
+class ConnectionPool:
+    """Keep-alive connections to the upstreams, pooled per ``(host, port)``.
+
+    Attributes:
+        max_idle (int): Largest number of idle connections kept per upstream.
+        max_per_host (int): Largest number of connections open to one
+                            upstream; callers wait for a free slot beyond it.
+        idle_timeout (float): Seconds an idle connection is kept.
+        connect_timeout (float): Seconds allowed to connect, and to wait
+                                 for a free slot.
+        read_timeout (float): Socket timeout of the pooled connections.
+    """
+
+    def __init__(self, max_idle=MAX_IDLE, max_per_host=MAX_PER_HOST, idle_timeout=IDLE_TIMEOUT,
+                 connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT):
+        self.max_idle = max_idle
+        self.max_per_host = max_per_host
+        self.idle_timeout = idle_timeout
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._idle = {}
+        self._open = {}
+        self._cond = threading.Condition()
+
+    def acquire(self, host, port):
+        """
+        Return a connection to an upstream, reusing an idle one if possible.
+
+        :raise UpstreamError: no slot became free within ``connect_timeout``.
+        :raise OSError: the connection could not be established.
+        :rtype UpstreamConnection: The connection; ``requests`` is 0 when it
+                                   was just opened.
+        """
+        key = (host, port)
+        stale = []
+        deadline = time.monotonic() + self.connect_timeout
+        try:
+            with self._cond:
+                while True:
+                    idle = self._idle.get(key)
+                    now = time.monotonic()
+                    while idle:
+                        # Most recently used first: the least likely to be stale
+                        conn = idle.pop()
+                        if now - conn.last_used < self.idle_timeout and conn.alive():
+                            return conn
+                        stale.append(conn)
+                        self._open[key] -= 1
+                    if self._open.get(key, 0) < self.max_per_host:
+                        self._open[key] = self._open.get(key, 0) + 1
+                        break
+                    if not self._cond.wait(deadline - now) or time.monotonic() >= deadline:
+                        raise UpstreamError("No free connection to {}:{}".format(host, port))
+        finally:
+            for conn in stale:
+                conn.close()
+
+        try:
+            sock = socket.create_connection(key, timeout=self.connect_timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.settimeout(self.read_timeout)
+        except OSError:
+            self._forget(key)
+            raise
+        return UpstreamConnection(host, port, sock)
+
+    def release(self, conn, reusable=True):
+        """
+        Return a connection to the pool, or close it.
+
+        :param conn (UpstreamConnection): A connection from :meth:`acquire`.
+        :param reusable (bool): The response was fully read and the
+                                connection can carry another request.
+        """
+        with self._cond:
+            idle = self._idle.setdefault(conn.key, deque())
+            if reusable and len(idle) < self.max_idle:
+                conn.last_used = time.monotonic()
+                idle.append(conn)
+                self._cond.notify()
+                return
+            self._open[conn.key] -= 1
+            self._cond.notify()
+        conn.close()
+
+    def _forget(self, key):
+        with self._cond:
+            self._open[key] -= 1
+            self._cond.notify()
+
+    def clear(self):
+        """Close every idle connection."""
+        with self._cond:
+            conns = [conn for idle in self._idle.values() for conn in idle]
+            for idle in self._idle.values():
+                idle.clear()
+            for conn in conns:
+                self._open[conn.key] -= 1
+            self._cond.notify_all()
+        for conn in conns:
+            conn.close()
+
+    def __repr__(self):
+        with self._cond:
+            idle = sum(len(conns) for conns in self._idle.values())
+            active = sum(self._open.values())
+        return "<ConnectionPool {} open, {} idle>".format(active, idle)
+
+
+#: Upstream connection pool of this process.
+UPSTREAM_POOL = ConnectionPool()
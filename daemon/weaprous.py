@@ -17,7 +17,11 @@ deamon.weaproute
 This module provides a WeApRous object to deploy RESTful url web app with routing
 """
 
+import inspect
+
 from .backend import create_backend
+from .httpreader import MAX_HEADER_SIZE
+from .middleware import Middleware, DEFAULT_MIDDLEWARE, PUBLIC_PATHS, compile_routes
 
 class WeApRous:
     """The fully mutable :class:`WeApRous <WeApRous>` object, which is a lightweight,
@@ -28,6 +32,7 @@ class WeApRous:
     using decorators and launch a TCP-based backend server to serve RESTful requests. 
     Each route is mapped to a handler function based on HTTP method and path. It mappings
     supports tracking the combined HTTP methods and path route mappings internally.
+    Handlers are called with the request ``headers`` and the raw ``body`` as bytes.
 
     Usage::
       >>> import daemon.weaprous
@@ -40,6 +45,23 @@ class WeApRous:
       >>> def hello(headers, body):
       >>>     return {'message': 'Hello, world!'}
 
+      >>> @app.route('/peers/<int:peer_id>', methods=['GET'])
+      >>> def get_peer(headers, body, peer_id):
+      >>>     return {'id': peer_id}
+
+      >>> @app.route('/get-list', methods=['GET'], public=True)
+      >>> def get_list(headers, body):
+      >>>     return {'peers': []}
+
+      >>> def log_request(req, resp):
+      >>>     print("{} {}".format(req.method, req.path))
+      >>> app.use(log_request)
+
+      >>> @app.route('/ping-all', methods=['GET'])
+      >>> async def ping_all(headers, body):
+      >>>     replies = await asyncio.gather(*(ping(p) for p in peers))
+      >>>     return {'replies': replies}
+
       >>> app.run()
     """
 
@@ -47,9 +69,13 @@ class WeApRous:
         """
         Initialize a new WeApRous instance.
 
-        Sets up an empty route registry and prepares placeholders for IP and port.
+        Sets up an empty route registry, the default middleware (form login and
+        session authentication) and prepares placeholders for IP and port.
         """
         self.routes = {}
+        self.router = None
+        self.middlewares = list(DEFAULT_MIDDLEWARE)
+        self.public_paths = list(PUBLIC_PATHS)
         self.ip = None
         self.port = None
         return
@@ -64,12 +90,56 @@ class WeApRous:
         self.ip = ip
         self.port = port
 
-    def route(self, path, methods=['GET']):
+    def use(self, func, name=None, auth=False):
+        """
+        Append a middleware to the pipeline run before every route hook.
+
+        The middleware is called as ``func(req, resp)`` and returns None to
+        continue, or a hook-like result to answer the request itself.
+
+        :param func (callable): The middleware.
+        :param name (str, optional): Name used by ``route(skip=...)``, defaults
+                to the function name.
+        :param auth (bool): Authentication middleware, not run on public routes.
+
+        :rtype: function - ``func``, so ``use`` can also decorate.
+        """
+        self.middlewares.append(Middleware(func, name, auth))
+        return func
+
+    def public(self, pattern, methods=['GET']):
+        """
+        Serve the paths matching ``pattern`` (static files included) without
+        authentication.
+
+        :param pattern (str): URL pattern, e.g. ``/assets/*``.
+        :param methods (list): HTTP methods to make public.
+        """
+        for method in methods:
+            self.public_paths.append((method.upper(), pattern))
+
+    def route(self, path, methods=['GET'], public=False, skip=()):
         """
         Decorator to register a route handler for a specific path and HTTP methods.
 
-        :param path (str): The URL path to route.
+        The path may contain parameters (``<name>``, ``<int:name>``,
+        ``<float:name>``, ``<path:name>``) or a trailing ``*`` wildcard; the
+        captured values are passed to the handler as keyword arguments.
+
+        Handlers may be plain functions or ``async def`` coroutines. Coroutine
+        handlers run on a shared event loop (the threaded engine) or on the
+        server loop itself (``engine="async"``), so they can await I/O without
+        holding a thread.
+
+        A handler may also return (or be) a generator or an async generator,
+        alone or as the body of a ``(body, content_type)`` tuple: its chunks
+        are streamed to the client with ``Transfer-Encoding: chunked`` as
+        they are produced.
+
+        :param path (str): The URL path pattern to route.
         :param methods (list): A list of HTTP methods (e.g., ['GET', 'POST']) to bind.
+        :param public (bool): Skip the authentication middleware for this route.
+        :param skip (list): Names of further middleware not run for this route.
 
         :rtype: function - A decorator that registers the handler function.
         """
@@ -80,22 +150,43 @@ class WeApRous:
             # Optional attach route metadata to the function
             func._route_path = path
             func._route_methods = methods
+            func._route_async = inspect.iscoroutinefunction(func)
+            func._route_public = public
+            func._route_skip = tuple(skip)
 
             return func
         return decorator
 
-    def run(self):
+    def run(self, max_workers=None, queue_size=None, engine="thread", workers=1,
+            reuse_port=False, max_header_size=MAX_HEADER_SIZE):
         """
         Start the backend server and begin handling requests.
 
         This method launches the TCP server using the configured IP and port,
         and dispatches incoming requests to the registered route handlers.
 
+        :param max_workers (int, optional): Serve connections from a bounded
+                worker pool of this size instead of one thread per connection.
+        :param queue_size (int, optional): Bound of the connections waiting
+                for a worker; extra clients receive ``503``.
+        :param engine (str): ``"thread"`` (default) or ``"async"`` for the
+                non-blocking event-loop engine.
+        :param workers (int): Number of pre-forked processes sharing the port.
+        :param reuse_port (bool): With ``workers > 1``, let every process bind
+                its own ``SO_REUSEPORT`` socket instead of inheriting one.
+        :param max_header_size (int): Largest accepted request header block;
+                larger ones are answered with ``431``.
+
         :raise: Error if IP or port has not been configured.
         """
         if not self.ip or not self.port:
             print("Rous app need to preapre address"
                   "by calling app.prepare_address(ip,port)")
 
-        create_backend(self.ip, self.port, self.routes)
+        # Compile the routing table and middleware chains once for the lifetime
+        # of the server
+        self.router = compile_routes(self.routes, self.middlewares, self.public_paths)
+
+        create_backend(self.ip, self.port, self.router, max_workers, queue_size, engine,
+                       workers, reuse_port, max_header_size)
         
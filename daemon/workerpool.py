@@ -0,0 +1,128 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.workerpool
+~~~~~~~~~~~~~~~~~
+
+This module provides a bounded pool of reusable worker threads. The backend
+hands every accepted connection to the pool instead of starting a fresh
+thread, so the number of threads stays fixed and the accept loop can shed
+load when the pending queue is full.
+
+Usage Example:
+--------------
+>>> pool = WorkerPool(max_workers=16, queue_size=64)
+>>> pool.start()
+>>> if not pool.submit(handle_client, ip, port, conn, addr, routes):
+>>>     conn.sendall(Response().build_unavailable())
+"""
+
+import queue
+import threading
+
+#: Default number of pending connections allowed per worker thread.
+QUEUE_FACTOR = 4
+
+
+class WorkerPool:
+    """A fixed-size pool of daemon threads consuming a bounded task queue.
+
+    Attributes:
+        max_workers (int): Number of worker threads.
+        queue_size (int): Maximum number of tasks waiting for a worker.
+        name (str): Prefix used for the worker thread names.
+    """
+
+    __attrs__ = [
+        "max_workers",
+        "queue_size",
+        "name",
+    ]
+
+    def __init__(self, max_workers, queue_size=None, name="worker"):
+        """
+        Initialize a new WorkerPool instance.
+
+        :param max_workers (int): Number of worker threads to run.
+        :param queue_size (int, optional): Bound of the pending task queue.
+                Defaults to ``max_workers * QUEUE_FACTOR``.
+        :param name (str): Prefix used for the worker thread names.
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+
+        #: Number of worker threads.
+        self.max_workers = max_workers
+        #: Bound of the pending task queue.
+        self.queue_size = queue_size or max_workers * QUEUE_FACTOR
+        #: Thread name prefix.
+        self.name = name
+        self._tasks = queue.Queue(maxsize=self.queue_size)
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start every worker thread. Calling it twice has no effect."""
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.max_workers):
+                t = threading.Thread(
+                    target=self._worker,
+                    name="{}-{}".format(self.name, i),
+                )
+                t.daemon = True
+                t.start()
+                self._threads.append(t)
+
+    def submit(self, func, *args):
+        """
+        Queue ``func(*args)`` for execution by the next free worker.
+
+        :param func (callable): The task to run.
+        :rtype bool: False when the queue is full and the task was rejected.
+        """
+        try:
+            self._tasks.put_nowait((func, args))
+        except queue.Full:
+            return False
+        return True
+
+    def pending(self):
+        """Return the approximate number of queued tasks."""
+        return self._tasks.qsize()
+
+    def shutdown(self, wait=True):
+        """
+        Stop the workers once the queued tasks are drained.
+
+        :param wait (bool): Block until every worker thread has exited.
+        """
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._tasks.put(None)
+        if wait:
+            for t in threads:
+                t.join()
+
+    def _worker(self):
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                return
+            func, args = task
+            try:
+                func(*args)
+            except Exception as e:
+                print("[WorkerPool] Task error: {}".format(e))
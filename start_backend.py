@@ -26,6 +26,12 @@ import socket
 import argparse
 
 from daemon import create_backend
+from daemon.staticcache import STATIC_CACHE
+from daemon.httpcache import CACHE_POLICY
+from daemon.compression import COMPRESSION
+from daemon.response import Response
+from daemon.session import SQLiteSessionStore, SESSION_TTL
+from daemon.httpreader import MAX_HEADER_SIZE
 
 # Default port number used if none is specified via command-line arguments.
 PORT = 9000 
@@ -40,6 +46,20 @@ if __name__ == "__main__":
 
     :arg --server-ip (str): IP address to bind the server (default: 127.0.0.1).
     :arg --server-port (int): Port number to bind the server (default: 9000).
+    :arg --max-workers (int): Serve clients from a bounded worker pool of this size.
+    :arg --queue-size (int): Pending connections allowed before answering 503.
+    :arg --engine (str): ``thread`` or ``async`` server engine (default: thread).
+    :arg --workers (int): Number of pre-forked backend processes (default: 1).
+    :arg --reuse-port: Bind one SO_REUSEPORT socket per worker process.
+    :arg --max-header-size (int): Largest request header block in bytes, for both engines.
+    :arg --cache-size (int): Memory budget of the static file cache in MiB.
+    :arg --cache-control (str): ``PREFIX=SECONDS`` max-age of static files under
+        a URL prefix, may be repeated.
+    :arg --no-compression: Never gzip/deflate responses.
+    :arg --session-db (str): SQLite file holding the sessions, shared by all workers.
+    :arg --session-ttl (int): Idle seconds before a session expires.
+    :arg --no-static-index: Resolve static paths on the filesystem for each request.
+    :arg --watch-static (float): Rescan the static directories every N seconds.
     """
 
     parser = argparse.ArgumentParser(
@@ -58,9 +78,106 @@ if __name__ == "__main__":
         default=PORT,
         help='Port number to bind the server. Default is {}.'.format(PORT)
     )
+    parser.add_argument(
+        '--max-workers',
+        type=int,
+        default=None,
+        help='Size of the worker thread pool. Default is one thread per connection.'
+    )
+    parser.add_argument(
+        '--queue-size',
+        type=int,
+        default=None,
+        help='Connections waiting for a worker before answering 503.'
+    )
+    parser.add_argument(
+        '--engine',
+        choices=['thread', 'async'],
+        default='thread',
+        help='Server engine: one thread per connection or a single event loop. Default is thread.'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Number of pre-forked backend processes sharing the port. Default is 1.'
+    )
+    parser.add_argument(
+        '--reuse-port',
+        action='store_true',
+        help='Let each worker process bind its own SO_REUSEPORT socket.'
+    )
+    parser.add_argument(
+        '--max-header-size',
+        type=int,
+        default=MAX_HEADER_SIZE,
+        help='Largest request line plus headers in bytes; larger requests get 431. '
+             'Default is {}.'.format(MAX_HEADER_SIZE)
+    )
+    parser.add_argument(
+        '--cache-size',
+        type=int,
+        default=None,
+        help='Memory budget of the static file cache in MiB, 0 to disable. Default is 64.'
+    )
+    parser.add_argument(
+        '--cache-control',
+        action='append',
+        default=[],
+        metavar='PREFIX=SECONDS',
+        help='Cache-Control max-age of static files under a URL prefix, e.g. /images/=86400.'
+    )
+    parser.add_argument(
+        '--no-compression',
+        action='store_true',
+        help='Send every response with the identity coding.'
+    )
+    parser.add_argument(
+        '--session-db',
+        type=str,
+        default=None,
+        help='SQLite file holding the sessions so that all workers share them. Default is in memory.'
+    )
+    parser.add_argument(
+        '--session-ttl',
+        type=int,
+        default=SESSION_TTL,
+        help='Idle seconds before a session expires. Default is {}.'.format(SESSION_TTL)
+    )
+    parser.add_argument(
+        '--no-static-index',
+        action='store_true',
+        help='Do not index www/ and static/ at startup; look files up on each request.'
+    )
+    parser.add_argument(
+        '--watch-static',
+        type=float,
+        default=0,
+        help='Rescan the static directories every N seconds to pick up new files. Default is off.'
+    )
  
     args = parser.parse_args()
     ip = args.server_ip
     port = args.server_port
 
-    create_backend(ip, port)
+    if args.cache_size is not None:
+        STATIC_CACHE.configure(max_bytes=args.cache_size * 1024 * 1024)
+    for rule in args.cache_control:
+        prefix, _, seconds = rule.partition('=')
+        if not seconds.isdigit():
+            parser.error("--cache-control expects PREFIX=SECONDS, got '{}'".format(rule))
+        CACHE_POLICY.set(prefix, int(seconds))
+    if args.no_compression:
+        COMPRESSION.enabled = False
+    if args.session_db:
+        Response.session_store = SQLiteSessionStore(args.session_db, ttl=args.session_ttl)
+    else:
+        Response.session_store.ttl = args.session_ttl
+    if args.no_static_index:
+        Response.static_index = None
+    else:
+        Response.static_index.watch_interval = args.watch_static
+
+    create_backend(ip, port, max_workers=args.max_workers, queue_size=args.queue_size,
+                   engine=args.engine, workers=args.workers, reuse_port=args.reuse_port,
+                   max_header_size=args.max_header_size)
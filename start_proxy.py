@@ -43,6 +43,9 @@ from urllib.parse import urlparse
 from collections import defaultdict
 import os
 from daemon import create_proxy
+from daemon.upstream import UPSTREAM_POOL
+from daemon.balancer import BALANCER
+from daemon.health import HEALTH_CHECKER
 
 PROXY_PORT = 8080
 
@@ -51,6 +54,15 @@ def parse_virtual_hosts(config_file):
     """
     Parses virtual host blocks from a config file.
 
+    A ``proxy_pass`` line may give the relative capacity of its backend,
+    as in ``proxy_pass http://localhost:9002 weight=3;``, which the
+    round-robin and least_conn policies honor.
+
+    ``dist_policy`` is one of ``round-robin``, ``least_conn``, ``random``,
+    ``ip_hash`` or ``hash <key> [consistent]``, for instance
+    ``dist_policy hash $cookie_sessionid consistent`` to keep each session
+    on the backend that holds it.
+
     :config_file (str): Path to the NGINX config file.
     :rtype list of dict: Each dict contains 'listen'and 'server_name'.
     """
@@ -74,8 +86,19 @@ def parse_virtual_hosts(config_file):
 
     for host, block in host_blocks:
         proxy_map = {}
-        # Find all proxy_pass entries
-        proxy_passes = re.findall(r'proxy_pass\s+http://([^\s;]+);', block)
+        # Find all proxy_pass entries, with their optional weight=N
+        proxy_passes = []
+        for address, options in re.findall(r'proxy_pass\s+http://([^\s;]+)([^;]*);', block):
+            weight = None
+            for option in options.split():
+                name, _, value = option.partition("=")
+                if name != "weight":
+                    continue
+                if not re.fullmatch(r'[0-9]+', value) or int(value) < 1:
+                    raise ValueError(f"Invalid weight '{value}' for '{address}' of host '{host}'; "
+                                     "expected a positive integer.")
+                weight = int(value)
+            proxy_passes.append(address + (f" weight={weight}" if weight else ""))
         if not proxy_passes:
             print(f"[WARN] No proxy_pass found for host '{host}'. Skipped.")
             continue
@@ -84,7 +107,7 @@ def parse_virtual_hosts(config_file):
         proxy_map[host] = map
 
         # Find dist_policy if present (fixed regex)
-        policy_match = re.search(r'dist_policy\s+([A-Za-z0-9\-_]+)', block)
+        policy_match = re.search(r'dist_policy\s+([A-Za-z0-9\-_]+(?:[ \t]+[^\s;]+)*)', block)
         if policy_match:
             dist_policy_map = policy_match.group(1).strip()
         else: # default policy is round-robin
@@ -112,6 +135,11 @@ def parse_virtual_hosts(config_file):
                 routes[host] = (proxy_map.get(host, []), "least_conn")
             elif policy_lower == "random":
                 routes[host] = (proxy_map.get(host, []), "random")
+            elif policy_lower == "ip_hash":
+                routes[host] = (proxy_map.get(host, []), "ip_hash")
+            elif re.match(r'hash\s+\S+(\s+consistent)?$', policy_lower):
+                # hash <key> [consistent]; the key keeps its case ($cookie_ names)
+                routes[host] = (proxy_map.get(host, []), dist_policy_map)
             else:
                 print(f"[WARN] Unknown policy '{dist_policy_map}' for host '{host}', fallback to round-robin.")
                 routes[host] = (proxy_map.get(host,[]), "round-robin")
@@ -135,16 +163,54 @@ if __name__ == "__main__":
 
     :arg --server-ip (str): IP address to bind the server (default: 127.0.0.1).
     :arg --server-port (int): Port number to bind the server (default: 9000).
+    :arg --workers (int): Number of pre-forked proxy processes (default: 1).
+    :arg --reuse-port: Bind one SO_REUSEPORT socket per worker process.
+    :arg --upstream-idle (int): Idle keep-alive connections kept per backend.
+    :arg --upstream-max-conns (int): Connections open to one backend at most.
+    :arg --upstream-idle-timeout (float): Seconds an idle backend connection is kept.
+    :arg --health-interval (float): Seconds between active health probes, 0 to disable.
+    :arg --health-path (str): Public path requested by the health probes (default: /login.html).
+    :arg --max-fails (int): Consecutive failed requests that eject a backend.
+    :arg --fail-timeout (float): Seconds of the first ejection of a backend.
     """
 
     parser = argparse.ArgumentParser(prog='Proxy', description='', epilog='Proxy daemon')
     parser.add_argument('--server-ip', default='0.0.0.0')
     parser.add_argument('--server-port', type=int, default=PROXY_PORT)
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of pre-forked proxy processes sharing the port.')
+    parser.add_argument('--reuse-port', action='store_true',
+                        help='Let each worker process bind its own SO_REUSEPORT socket.')
+    parser.add_argument('--upstream-idle', type=int, default=UPSTREAM_POOL.max_idle,
+                        help='Idle keep-alive connections kept per backend. 0 disables pooling.')
+    parser.add_argument('--upstream-max-conns', type=int, default=UPSTREAM_POOL.max_per_host,
+                        help='Connections open to one backend at most, per proxy process.')
+    parser.add_argument('--upstream-idle-timeout', type=float, default=UPSTREAM_POOL.idle_timeout,
+                        help='Seconds an idle backend connection is kept. Keep it below '
+                             'the keep-alive timeout of the backends.')
+    parser.add_argument('--health-interval', type=float, default=HEALTH_CHECKER.interval,
+                        help='Seconds between active health probes of the backends. 0 disables them.')
+    parser.add_argument('--health-path', default=HEALTH_CHECKER.path,
+                        help='Public path requested by the health probes; 2xx and 3xx answers are '
+                             'healthy. Default: %(default)s.')
+    parser.add_argument('--max-fails', type=int, default=BALANCER.max_fails,
+                        help='Consecutive failed requests that eject a backend.')
+    parser.add_argument('--fail-timeout', type=float, default=BALANCER.fail_timeout,
+                        help='Seconds of the first ejection of a backend; doubles after each '
+                             'failed trial, up to {:.0f}s.'.format(BALANCER.max_fail_timeout))
  
     args = parser.parse_args()
     ip = args.server_ip
     port = args.server_port
 
+    UPSTREAM_POOL.max_idle = args.upstream_idle
+    UPSTREAM_POOL.max_per_host = args.upstream_max_conns
+    UPSTREAM_POOL.idle_timeout = args.upstream_idle_timeout
+    HEALTH_CHECKER.interval = args.health_interval
+    HEALTH_CHECKER.path = args.health_path
+    BALANCER.max_fails = args.max_fails
+    BALANCER.fail_timeout = args.fail_timeout
+
     routes = parse_virtual_hosts("config/proxy.conf")
 
-    create_proxy(ip, port, routes)
+    create_proxy(ip, port, routes, workers=args.workers, reuse_port=args.reuse_port)